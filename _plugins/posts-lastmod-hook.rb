@@ -1,13 +1,42 @@
 #!/usr/bin/env ruby
 #
 # Check for changed posts
+#
+# Commit counts and dates come from _data/lastmod.json, written by
+# tools/update_lastmod.py in one pass over the history. Without that file,
+# or when it was written for a commit other than HEAD (it is not tracked, so
+# local copies go stale), git is asked about each post instead.
+
+require 'json'
+
+Jekyll::Hooks.register :site, :after_reset do |site|
+  path = File.join(site.source, '_data', 'lastmod.json')
+  $posts_lastmod = nil
+  if File.exist?(path)
+    data = JSON.parse(File.read(path))
+    head = `git rev-parse HEAD`.strip
+    if data['commit'] == head
+      $posts_lastmod = data['posts']
+    else
+      Jekyll.logger.warn 'Lastmod:', "#{path} is for #{data['commit']}, not HEAD; " \
+                                     'run tools/update_lastmod.py. Asking git per post.'
+    end
+  end
+end
 
 Jekyll::Hooks.register :posts, :post_init do |post|
 
-  commit_num = `git rev-list --count HEAD "#{ post.path }"`
+  if $posts_lastmod
+    entry = $posts_lastmod[post.relative_path]
+    commit_num = entry ? entry['commits'] : 0
+    lastmod_date = entry && entry['lastmod']
+  else
+    commit_num = `git rev-list --count HEAD "#{ post.path }"`
+    lastmod_date = nil
+  end
 
   if commit_num.to_i > 1
-    lastmod_date = `git log -1 --pretty="%ad" --date=iso "#{ post.path }"`
+    lastmod_date ||= `git log -1 --pretty="%ad" --date=iso "#{ post.path }"`
     post.data['last_modified_at'] = lastmod_date
   end
 
@@ -0,0 +1,517 @@
+"""Re-summarise and re-tag existing posts with a Bedrock batch inference job.
+
+Instead of one on-demand converse call per post, every prompt goes into a
+single batch job, billed at the batch rate. The work happens in stages,
+each of which can be run on its own and picks up from the last:
+
+    prepare   write one JSONL record per prompt (summary and metadata for
+              video posts, metadata for Builder Center posts)
+    submit    upload the records and create the job
+    wait      poll until the job finishes, then fetch its output
+    ingest    parse the output and rewrite the posts' front matter and summaries
+    run       all four in turn
+
+By default only posts the tools generated are backfilled: those with a
+sync manifest entry written by new-post or the porter. Posts that were
+seeded into the manifest from an existing file (hand-written, or older
+than the manifest) are left alone unless named on the command line, and
+even then only their front matter is regenerated, never their text.
+With ``--include-seeded`` seeded posts are backfilled as well, video
+summaries included; seeded posts edited since seeding are still skipped
+at ingest unless ``--force`` is given.
+
+Records use the InvokeModel body format of Anthropic models and the same
+prompts as new_post.call_bedrock and port_builder_articles.generate_metadata.
+The bucket may be an ``s3://`` URI or a local directory: with a directory,
+submit copies the input there and records the job request without calling
+Bedrock, and wait finishes once a ``*.jsonl.out`` file appears under the
+output directory, so every stage except the job itself runs offline.
+
+    python tools/backfill_posts.py prepare [POST ...]
+    python tools/backfill_posts.py submit --bucket s3://my-bucket/backfill --role-arn arn:aws:iam::...
+    python tools/backfill_posts.py wait
+    python tools/backfill_posts.py ingest
+"""
+
+import argparse
+import json
+import re
+import shutil
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Shared helpers live alongside the new-post tool.
+sys.path.insert(0, str(Path(__file__).resolve().parent / "new-post"))
+
+import bedrock_runtime  # noqa: E402
+import new_post  # noqa: E402
+import port_builder_articles  # noqa: E402
+from disk_cache import CACHE_ROOT  # noqa: E402
+from post_index import POST_INDEX, parse_front_matter  # noqa: E402
+from related_posts import RELATED_POSTS  # noqa: E402
+from search_index import FRONT_MATTER_RE, SEARCH_INDEX  # noqa: E402
+from sync_manifest import MANIFEST, YOUTUBE_EMBED_RE, file_hash  # noqa: E402
+
+BLOG_ROOT = Path(__file__).resolve().parent.parent
+WORK_ROOT = CACHE_ROOT / "backfill"
+
+ANTHROPIC_VERSION = "bedrock-2023-05-31"
+TASKS = ("summary", "metadata")
+# Batch jobs below this many records are rejected under the default quota.
+MIN_RECORDS = 100
+# A batch prompt cannot be map-reduced, so very long transcripts are cut.
+TRANSCRIPT_CHARS = 200_000
+POLL_SECONDS = 60
+DONE_STATUSES = {"Completed", "PartiallyCompleted", "Failed", "Stopped", "Expired"}
+FETCH_WORKERS = 4
+
+SUMMARY_END_RE = re.compile(r"^## ", re.MULTILINE)
+
+# Why posts of each provenance are left out of a default run.
+SKIP_REASONS = {
+    "seeded": "seeded from existing files (use --include-seeded)",
+    "untracked": "not in the sync manifest",
+}
+
+
+def work_dir(name: str) -> Path:
+    return WORK_ROOT / name
+
+
+def load_job(name: str) -> dict:
+    path = work_dir(name) / "job.json"
+    if not path.exists():
+        raise SystemExit(f"No backfill named {name!r}; run prepare first.")
+    return json.loads(path.read_text())
+
+
+def save_job(job: dict) -> None:
+    (work_dir(job["name"]) / "job.json").write_text(json.dumps(job, indent=2) + "\n")
+
+
+def latest_name() -> str | None:
+    names = sorted(p.name for p in WORK_ROOT.glob("*") if (p / "job.json").exists())
+    return names[-1] if names else None
+
+
+def model_input(system: str, prompt: str, max_tokens: int) -> dict:
+    """An InvokeModel request body for an Anthropic model."""
+    return {
+        "anthropic_version": ANTHROPIC_VERSION,
+        "max_tokens": max_tokens,
+        "system": system,
+        "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}],
+    }
+
+
+def provenance(rel: str, source: str) -> str:
+    """Where a post came from, as far as the sync manifest knows.
+
+    "generated" if one of the tools wrote it, "seeded" if its entry was
+    seeded from the existing file, and "untracked" if it has no entry.
+    """
+    entry = MANIFEST.get(source)
+    if not entry or entry["post"] != rel:
+        return "untracked"
+    return "generated" if entry["updated"] else "seeded"
+
+
+def may_rewrite_text(rel: str, source: str, include_seeded: bool) -> bool:
+    """True if the post's text (not just its front matter) may be regenerated."""
+    allowed = ("generated", "seeded") if include_seeded else ("generated",)
+    return provenance(rel, source) in allowed
+
+
+def output_text(record: dict) -> str | None:
+    """The completion text of one output record, or None if it failed."""
+    output = record.get("modelOutput")
+    if not output or record.get("error"):
+        return None
+    return "".join(block.get("text", "") for block in output.get("content", []))
+
+
+# Prepare
+
+
+def video_requests(post: dict, tasks: tuple[str, ...]) -> list[tuple[str, dict]]:
+    """(task, model input) pairs for a video post, from its cached video info."""
+    video_id = post["source"].split(":", 1)[1]
+    info = new_post.fetch_metadata(f"https://www.youtube.com/watch?v={video_id}")
+    transcript = new_post.get_transcript(info)
+    source = f"**Transcript:**\n{transcript[:TRANSCRIPT_CHARS]}"
+    title = info.get("title") or post["title"]
+    description = info.get("description", "")
+    requests = []
+    if "summary" in tasks:
+        prompt = new_post.video_prompt(title, description, source)
+        requests.append(
+            ("summary", model_input(new_post.SUMMARY_INSTRUCTIONS, prompt, new_post.SUMMARY_MAX_TOKENS))
+        )
+    if "metadata" in tasks:
+        prompt = new_post.video_prompt(title, description, source[: new_post.METADATA_SOURCE_CHARS])
+        requests.append(
+            ("metadata", model_input(new_post.metadata_instructions(), prompt, new_post.METADATA_MAX_TOKENS))
+        )
+    return requests
+
+
+def article_requests(post: dict, tasks: tuple[str, ...]) -> list[tuple[str, dict]]:
+    """(task, model input) pairs for a Builder Center post (metadata only)."""
+    if "metadata" not in tasks:
+        return []
+    raw = port_builder_articles.ARTICLE_CACHE.get(post["source"])
+    if raw is not None:
+        article = port_builder_articles.extract_article(raw)
+        body, bc_tags = article["body"], article["bc_tags"]
+    else:
+        body, bc_tags = FRONT_MATTER_RE.sub("", (BLOG_ROOT / post["path"]).read_text()), []
+    prompt = port_builder_articles.metadata_prompt(post["title"], body, bc_tags)
+    system = port_builder_articles.metadata_instructions()
+    return [("metadata", model_input(system, prompt, port_builder_articles.METADATA_MAX_TOKENS))]
+
+
+def prepare(
+    name: str,
+    tasks: tuple[str, ...],
+    model: str | None,
+    paths: list[Path],
+    include_seeded: bool = False,
+) -> dict:
+    """Write the batch input records and the job file for a new backfill."""
+    posts = [p for p in POST_INDEX.posts.values() if p["source"]]
+    if paths:
+        wanted = {str(p.resolve().relative_to(BLOG_ROOT)) for p in paths}
+        posts = [p for p in posts if p["path"] in wanted]
+    else:
+        included = []
+        skipped = Counter()
+        for post in posts:
+            if may_rewrite_text(post["path"], post["source"], include_seeded):
+                included.append(post)
+            else:
+                skipped[provenance(post["path"], post["source"])] += 1
+        for reason, count in sorted(skipped.items()):
+            print(f"Skipped {count} posts {SKIP_REASONS[reason]}")
+        posts = included
+
+    def requests_for(post: dict) -> list[tuple[str, dict]]:
+        post_tasks = tasks
+        if not may_rewrite_text(post["path"], post["source"], include_seeded):
+            post_tasks = tuple(t for t in tasks if t != "summary")
+        try:
+            if post["source"].startswith("youtube:"):
+                return video_requests(post, post_tasks)
+            return article_requests(post, post_tasks)
+        except Exception as e:
+            print(f"  SKIPPED {post['path']}: {type(e).__name__}: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        per_post = list(pool.map(requests_for, posts))
+
+    directory = work_dir(name)
+    directory.mkdir(parents=True, exist_ok=True)
+    records = {}
+    with open(directory / "input.jsonl", "w") as f:
+        for post, requests in zip(posts, per_post):
+            for task, body in requests:
+                record_id = f"R{len(records) + 1:07d}"
+                records[record_id] = {"post": post["path"], "source": post["source"], "task": task}
+                f.write(json.dumps({"recordId": record_id, "modelInput": body}, ensure_ascii=False) + "\n")
+
+    # One job runs one model: the summary model if there are any summaries to write.
+    route = "summary" if any(r["task"] == "summary" for r in records.values()) else "metadata"
+    job = {
+        "name": name,
+        "model": model or bedrock_runtime.MODEL_ROUTES[route][0],
+        "tasks": list(tasks),
+        "include_seeded": include_seeded,
+        "records": records,
+        "status": "Prepared",
+    }
+    save_job(job)
+    print(f"Wrote {len(records)} records for {len(posts)} posts to {directory / 'input.jsonl'}")
+    return job
+
+
+# Submit and wait
+
+
+def split_s3(uri: str) -> tuple[str, str]:
+    bucket, _, key = uri[len("s3://") :].partition("/")
+    return bucket, key.strip("/")
+
+
+def is_s3(uri: str) -> bool:
+    return uri.startswith("s3://")
+
+
+def submit(job: dict, bucket: str, role_arn: str | None) -> dict:
+    """Upload the input records and create the batch job (or stage it locally)."""
+    if len(job["records"]) < MIN_RECORDS:
+        print(
+            f"Warning: {len(job['records'])} records; Bedrock rejects jobs under {MIN_RECORDS} "
+            "unless the quota has been raised."
+        )
+    input_path = work_dir(job["name"]) / "input.jsonl"
+    base = bucket.rstrip("/") + "/" + job["name"]
+    job["input_uri"] = f"{base}/input/input.jsonl"
+    job["output_uri"] = f"{base}/output/"
+    request = {
+        "jobName": job["name"],
+        "modelId": job["model"],
+        "roleArn": role_arn,
+        "inputDataConfig": {"s3InputDataConfig": {"s3Uri": job["input_uri"], "s3InputFormat": "JSONL"}},
+        "outputDataConfig": {"s3OutputDataConfig": {"s3Uri": job["output_uri"]}},
+    }
+
+    if is_s3(bucket):
+        if not role_arn:
+            raise SystemExit("--role-arn is required to submit to Bedrock.")
+        import boto3
+
+        s3_bucket, key = split_s3(job["input_uri"])
+        boto3.client("s3").upload_file(str(input_path), s3_bucket, key)
+        response = boto3.client("bedrock").create_model_invocation_job(**request)
+        job["job_arn"] = response["jobArn"]
+    else:
+        dest = Path(job["input_uri"])
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        Path(job["output_uri"]).mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(input_path, dest)
+        (dest.parent / "request.json").write_text(json.dumps(request, indent=2) + "\n")
+        job["job_arn"] = None
+    job["status"] = "Submitted"
+    job["submitted"] = datetime.now().isoformat(timespec="seconds")
+    save_job(job)
+    print(f"Submitted {job['name']} ({len(job['records'])} records, model {job['model']})")
+    return job
+
+
+def find_output(output_uri: str) -> str | None:
+    """The ``.jsonl.out`` file under the job's output location, if written yet."""
+    if is_s3(output_uri):
+        import boto3
+
+        bucket, prefix = split_s3(output_uri)
+        pages = boto3.client("s3").get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix)
+        for page in pages:
+            for obj in page.get("Contents", []):
+                if obj["Key"].endswith(".jsonl.out"):
+                    return f"s3://{bucket}/{obj['Key']}"
+        return None
+    found = sorted(Path(output_uri).rglob("*.jsonl.out"))
+    return str(found[0]) if found else None
+
+
+def job_status(job: dict) -> str:
+    if job.get("job_arn"):
+        import boto3
+
+        return boto3.client("bedrock").get_model_invocation_job(jobIdentifier=job["job_arn"])["status"]
+    return "Completed" if find_output(job["output_uri"]) else "InProgress"
+
+
+def wait(job: dict, poll: float = POLL_SECONDS) -> dict:
+    """Poll until the job finishes, then download its output next to the input."""
+    while True:
+        status = job_status(job)
+        if status != job["status"]:
+            print(f"{datetime.now():%H:%M:%S} {job['name']}: {status}")
+            job["status"] = status
+            save_job(job)
+        if status in DONE_STATUSES:
+            break
+        time.sleep(poll)
+    if status not in ("Completed", "PartiallyCompleted"):
+        raise SystemExit(f"Batch job {job['name']} ended {status}.")
+
+    source = find_output(job["output_uri"])
+    if source is None:
+        raise SystemExit(f"No output found under {job['output_uri']}.")
+    dest = work_dir(job["name"]) / "output.jsonl.out"
+    if is_s3(source):
+        import boto3
+
+        bucket, key = split_s3(source)
+        boto3.client("s3").download_file(bucket, key, str(dest))
+    else:
+        shutil.copyfile(source, dest)
+    print(f"Output saved to {dest}")
+    return job
+
+
+# Ingest
+
+
+def set_front_matter(text: str, fields: dict[str, str]) -> str:
+    """Replace (or add) top-level front matter lines, leaving the rest untouched."""
+    end = text.find("\n---", 3)
+    lines = text[:end].split("\n")
+    for key, value in fields.items():
+        line = f"{key}: {value}"
+        for i, existing in enumerate(lines):
+            if existing.startswith(f"{key}:"):
+                lines[i] = line
+                break
+        else:
+            lines.append(line)
+    return "\n".join(lines) + text[end:]
+
+
+def set_summary(text: str, summary: str) -> str:
+    """Replace the paragraphs between a video post's embed and its first heading."""
+    embed = YOUTUBE_EMBED_RE.search(text)
+    if embed is None:
+        return text
+    start = text.index("\n", embed.end()) + 1
+    heading = SUMMARY_END_RE.search(text, start)
+    end = heading.start() if heading else len(text)
+    tail = "\n\n" if heading else "\n"
+    return f"{text[:start]}\n{summary.strip()}{tail}{text[end:]}"
+
+
+def yaml_fields(description: str, categories: list[str], tags: list[str]) -> dict[str, str]:
+    """Front matter values formatted as the tools write them; an empty description is left alone."""
+    fields = {"categories": f"[{', '.join(categories)}]", "tags": f"[{', '.join(tags)}]"}
+    if description:
+        fields["description"] = '"{}"'.format(description.replace('"', '\\"'))
+    return fields
+
+
+def rewrite_post(path: Path, source: str, outputs: dict[str, str]) -> str:
+    """Apply one post's batch outputs; returns what was done."""
+    original = text = path.read_text()
+    if source.startswith("youtube:"):
+        result = new_post.parse_bedrock_response(outputs.get("metadata", ""))
+        if "summary" in outputs:
+            text = set_summary(text, outputs["summary"])
+        if "metadata" in outputs:
+            text = set_front_matter(
+                text, yaml_fields(result["seo_description"], result["categories"], result["tags"])
+            )
+    elif "metadata" in outputs:
+        title = parse_front_matter(text).get("title", "")
+        result = port_builder_articles.parse_metadata(outputs["metadata"], title)
+        text = set_front_matter(text, yaml_fields(result["description"], result["categories"], result["tags"]))
+    if text == original:
+        return "unchanged"
+    previous = file_hash(path)
+    path.write_text(text)
+    MANIFEST.post_rewritten(path, previous)
+    POST_INDEX.add(path)
+    return "rewritten"
+
+
+def ingest(job: dict, output: Path | None = None, force: bool = False) -> list[dict]:
+    """Rewrite posts from the job's output records."""
+    output = output or work_dir(job["name"]) / "output.jsonl.out"
+    per_post = {}
+    failed = 0
+    with open(output) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            meta = job["records"].get(record.get("recordId"))
+            text = output_text(record)
+            if meta is None or text is None:
+                failed += 1
+                continue
+            per_post.setdefault((meta["post"], meta["source"]), {})[meta["task"]] = text
+
+    results = []
+    for (rel, source), outputs in sorted(per_post.items()):
+        path = BLOG_ROOT / rel
+        entry = MANIFEST.get(source)
+        if not path.exists():
+            status = "missing"
+        elif not may_rewrite_text(rel, source, job.get("include_seeded", False)):
+            # Named explicitly at prepare time; the text is the author's own.
+            outputs.pop("summary", None)
+            status = rewrite_post(path, source, outputs)
+        elif file_hash(path) != entry["content_hash"] and not force:
+            status = "edited by hand; skipped"
+        else:
+            status = rewrite_post(path, source, outputs)
+        results.append({"post": rel, "status": status})
+        print(f"  {rel}: {status}")
+
+    rewritten = [BLOG_ROOT / r["post"] for r in results if r["status"] == "rewritten"]
+    if rewritten:
+        SEARCH_INDEX.update(rewritten)
+        RELATED_POSTS.update(rewritten)
+    print(f"\n{len(rewritten)} posts rewritten, {failed} records failed or unknown.")
+    job["status"] = "Ingested"
+    save_job(job)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill posts with a Bedrock batch inference job.")
+    parser.add_argument("--name", help="backfill to work on (default: new for prepare, else the latest)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sub = {
+        name: commands.add_parser(name, help=help)
+        for name, help in (
+            ("prepare", "write the batch input records"),
+            ("submit", "upload the records and create the job"),
+            ("wait", "poll until the job finishes and fetch its output"),
+            ("ingest", "rewrite posts from the job's output"),
+            ("run", "prepare, submit, wait and ingest"),
+        )
+    }
+    for name in ("prepare", "run"):
+        sub[name].add_argument(
+            "--tasks",
+            default=",".join(TASKS),
+            help=f"comma-separated tasks to backfill (default: {','.join(TASKS)})",
+        )
+        sub[name].add_argument("--model", help="model ID for the job (default: the first routed for the tasks)")
+        sub[name].add_argument(
+            "--include-seeded",
+            action="store_true",
+            help="also backfill posts seeded into the manifest from existing files, summaries included",
+        )
+        sub[name].add_argument(
+            "posts", nargs="*", type=Path, help="posts to backfill (default: every post the tools generated)"
+        )
+    for name in ("submit", "run"):
+        sub[name].add_argument("--bucket", required=True, help="s3://bucket/prefix, or a local directory")
+        sub[name].add_argument("--role-arn", help="IAM role Bedrock uses to read the input and write the output")
+    for name in ("wait", "run"):
+        sub[name].add_argument("--poll", type=float, default=POLL_SECONDS, help="seconds between status checks")
+    for name in ("ingest", "run"):
+        sub[name].add_argument("--force", action="store_true", help="rewrite posts even if edited by hand")
+    sub["ingest"].add_argument("--output", type=Path, help="output records to read (default: the one wait fetched)")
+    args = parser.parse_args()
+
+    if args.command in ("prepare", "run"):
+        tasks = tuple(t.strip() for t in args.tasks.split(",") if t.strip())
+        unknown = set(tasks) - set(TASKS)
+        if unknown:
+            parser.error(f"unknown task(s): {', '.join(sorted(unknown))}")
+        name = args.name or f"backfill-{datetime.now():%Y%m%d-%H%M%S}"
+        job = prepare(name, tasks, args.model, args.posts, args.include_seeded)
+    else:
+        name = args.name or latest_name()
+        if name is None:
+            parser.error("no backfill prepared yet")
+        job = load_job(name)
+
+    if args.command in ("submit", "run"):
+        job = submit(job, args.bucket, args.role_arn)
+    if args.command in ("wait", "run"):
+        job = wait(job, args.poll)
+    if args.command == "ingest":
+        ingest(job, args.output, args.force)
+    elif args.command == "run":
+        ingest(job, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
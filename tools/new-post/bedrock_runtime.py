@@ -0,0 +1,371 @@
+"""Shared Bedrock runtime access with model routing and prompt-hash memoization."""
+
+import hashlib
+import json
+import os
+import threading
+
+import ratelimit
+import tracing
+from disk_cache import DiskCache
+
+# Memoized responses never expire; they only go when evicted for space.
+RESPONSE_CACHE = DiskCache("bedrock", ttl=None, max_bytes=512 * 1024 * 1024)
+
+# In replay mode a memo miss raises instead of calling the service, so a run
+# against a recorded cache (see BLOG_TOOLS_CACHE) is offline and deterministic.
+REPLAY_ONLY = os.environ.get("BEDROCK_REPLAY") == "1"
+
+# Error codes that mean "slow down", and ones worth retrying as they are.
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException"}
+RETRY_CODES = {
+    "InternalServerException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+}
+
+OPUS = "global.anthropic.claude-opus-4-6-v1"
+SONNET = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"
+HAIKU = "global.anthropic.claude-haiku-4-5-20251001-v1:0"
+
+# Models tried in turn for each kind of request: the first is used unless it
+# fails (after the rate limiter's retries), then the next, and so on. Long
+# form writing gets the large model; notes and metadata are small tasks that
+# a fast model does as well, in a fraction of the time and cost. Override a
+# task with BEDROCK_MODEL_<TASK>=id[,id...] or the tools' --model option.
+MODEL_ROUTES = {
+    "summary": (OPUS, SONNET),
+    "notes": (HAIKU, SONNET),
+    "metadata": (HAIKU, SONNET),
+}
+
+# Per model, as Bedrock quotas are; see limiter().
+LIMITER_SETTINGS = {"rate": 2.0, "max_rate": 20.0, "burst": 4.0}
+
+_client = None
+_client_lock = threading.Lock()
+_limiters = {}
+
+
+class ReplayMiss(RuntimeError):
+    """Raised in replay mode when a prompt has no recorded response."""
+
+
+def get_client():
+    """Return a Bedrock runtime client shared across worker threads.
+
+    boto3 clients are thread-safe once built, but creating them from the
+    default session is not, so workers must not each call boto3.client.
+    boto3 itself is imported here, as it takes longer to import than most
+    runs spend before needing it. The SDK's own retries are turned off:
+    call() retries under the shared rate limiter instead, which needs to
+    see every throttle to adapt.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            import boto3
+            from botocore.config import Config
+
+            config = Config(retries={"mode": "standard", "total_max_attempts": 1})
+            _client = boto3.client("bedrock-runtime", config=config)
+    return _client
+
+
+def classify_error(exc: Exception) -> tuple[str | None, float | None]:
+    """Sort a Bedrock error into throttle, retryable or fatal (see ratelimit.call)."""
+    from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+    if isinstance(exc, ClientError):
+        code = exc.response.get("Error", {}).get("Code")
+        meta = exc.response.get("ResponseMetadata", {})
+        retry_after = ratelimit.parse_retry_after(meta.get("HTTPHeaders", {}).get("retry-after"))
+        if code in THROTTLE_CODES or meta.get("HTTPStatusCode") == 429:
+            return "throttle", retry_after
+        if code in RETRY_CODES or meta.get("HTTPStatusCode", 0) >= 500:
+            return "retry", retry_after
+        return None, None
+    if isinstance(exc, (ConnectionError, HTTPClientError)):
+        return "retry", None
+    return None, None
+
+
+def set_route(spec: str) -> None:
+    """Apply a ``TASK=MODEL[,MODEL...]`` override to MODEL_ROUTES."""
+    task, _, models = spec.partition("=")
+    if task not in MODEL_ROUTES or not models:
+        raise ValueError(f"Expected TASK=MODEL[,MODEL...] with TASK one of {', '.join(MODEL_ROUTES)}")
+    MODEL_ROUTES[task] = tuple(m.strip() for m in models.split(",") if m.strip())
+
+
+for _task in MODEL_ROUTES:
+    if os.environ.get(f"BEDROCK_MODEL_{_task.upper()}"):
+        set_route(f"{_task}={os.environ[f'BEDROCK_MODEL_{_task.upper()}']}")
+
+
+def limiter(model_id: str) -> ratelimit.AdaptiveRateLimiter:
+    """The rate limiter for one model, shared by every caller in the process."""
+    with _client_lock:
+        if model_id not in _limiters:
+            _limiters[model_id] = ratelimit.AdaptiveRateLimiter(f"bedrock:{model_id}", **LIMITER_SETTINGS)
+        return _limiters[model_id]
+
+
+def call(operation: str, **kwargs) -> dict:
+    """Invoke a client operation under the model's rate limiter."""
+    method = getattr(get_client(), operation)
+    return ratelimit.call(limiter(kwargs["modelId"]), lambda: method(**kwargs), classify_error)
+
+
+def request_key(model_id: str, prompt: str, inference_config: dict, system: str | None = None) -> str:
+    """Hash a request so byte-identical prompts share one memo entry."""
+    request = {"modelId": model_id, "prompt": prompt, "inferenceConfig": inference_config}
+    if system is not None:
+        request["system"] = system
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def request_args(model_id: str, prompt: str, inference_config: dict, system: str | None) -> dict:
+    """Converse arguments for a single-turn request.
+
+    No prompt cache point is set: the shared system prompts are a few
+    hundred tokens, below the smallest prefix Bedrock caches for these
+    models (1,024 to 4,096 tokens), so one would have no effect. Repeated
+    requests are served from RESPONSE_CACHE instead.
+    """
+    args = {
+        "modelId": model_id,
+        "messages": [{"role": "user", "content": [{"text": prompt}]}],
+        "inferenceConfig": inference_config,
+    }
+    if system:
+        args["system"] = [{"text": system}]
+    return args
+
+
+def record_usage(span: tracing.Span, usage: dict) -> None:
+    """Add a live call's token usage to its span, or mark it unknown if absent."""
+    if not usage:
+        span.set(usage="unknown")
+        return
+    span.add("input_tokens", usage.get("inputTokens", 0))
+    span.add("output_tokens", usage.get("outputTokens", 0))
+
+
+def converse(model_id: str, prompt: str, inference_config: dict, system: str | None = None) -> dict:
+    """Send a single-turn prompt and return ``{"text", "usage", "cached"}``.
+
+    Responses are memoized on (model ID, system prompt, prompt,
+    inferenceConfig). ``usage`` is the Bedrock usage block from the
+    original call.
+    """
+    with tracing.span("bedrock.converse", model=model_id) as span:
+        key = request_key(model_id, prompt, inference_config, system)
+        memo = RESPONSE_CACHE.get(key)
+        if memo is not None:
+            span.add("cache_hits")
+            return {**memo, "cached": True}
+        if REPLAY_ONLY:
+            raise ReplayMiss(f"No recorded Bedrock response for request {key[:12]}")
+
+        response = call("converse", **request_args(model_id, prompt, inference_config, system))
+        memo = {
+            "text": response["output"]["message"]["content"][0]["text"],
+            "usage": response.get("usage", {}),
+        }
+        record_usage(span, memo["usage"])
+        RESPONSE_CACHE.set(key, memo)
+        return {**memo, "cached": False}
+
+
+def converse_stream(
+    model_id: str,
+    prompt: str,
+    inference_config: dict,
+    system: str | None = None,
+    on_text=None,
+    stop_when=None,
+) -> dict:
+    """Like converse(), but streams the completion via converse_stream.
+
+    ``on_text(delta)`` is called for each chunk of generated text; a
+    memoized response is delivered as one chunk. If ``stop_when()`` returns
+    true after a chunk, the stream is closed and generation stops there.
+    The usage block arrives with the final event, so after an early stop
+    the span's usage is marked unknown rather than counted as zero.
+    """
+    with tracing.span("bedrock.converse_stream", model=model_id) as span:
+        key = request_key(model_id, prompt, inference_config, system)
+        memo = RESPONSE_CACHE.get(key)
+        if memo is not None:
+            span.add("cache_hits")
+            if on_text:
+                on_text(memo["text"])
+            return {**memo, "cached": True}
+        if REPLAY_ONLY:
+            raise ReplayMiss(f"No recorded Bedrock response for request {key[:12]}")
+
+        response = call("converse_stream", **request_args(model_id, prompt, inference_config, system))
+        stream = response["stream"]
+        parts = []
+        usage = {}
+        try:
+            for event in stream:
+                if "contentBlockDelta" in event:
+                    delta = event["contentBlockDelta"]["delta"].get("text", "")
+                    parts.append(delta)
+                    if on_text:
+                        on_text(delta)
+                    if stop_when and stop_when():
+                        span.set(stopped_early=True)
+                        break
+                elif "metadata" in event:
+                    usage = event["metadata"].get("usage", {})
+        finally:
+            stream.close()
+
+        memo = {"text": "".join(parts), "usage": usage}
+        record_usage(span, usage)
+        RESPONSE_CACHE.set(key, memo)
+        return {**memo, "cached": False}
+
+
+class SectionParser:
+    """Incrementally splits a completion laid out as ``NAME:`` sections.
+
+    Sections are expected in the given order, each introduced by its name
+    and a colon on a line of its own. ``on_section(name, text)`` fires as
+    each section completes. The last section must hold a JSON array, and
+    ``done`` becomes true as soon as that array closes.
+    """
+
+    def __init__(self, sections: list[str], on_section=None):
+        self.sections = sections
+        self.on_section = on_section
+        self.buffer = ""
+        self.done = False
+        self._longest_header = max(len(name) for name in sections) + 1
+        self._index = -1  # section currently being received
+        self._content_start = 0
+        # JSON array scan state for the final section
+        self._scan_pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, delta: str) -> None:
+        if self.done:
+            return
+        # A header may straddle the previous chunk boundary
+        search_from = max(self._content_start, len(self.buffer) - self._longest_header)
+        self.buffer += delta
+        while self._index + 1 < len(self.sections):
+            header = self.sections[self._index + 1] + ":"
+            at = self.buffer.find(header, search_from)
+            while at > 0 and self.buffer[at - 1] != "\n":
+                at = self.buffer.find(header, at + 1)
+            if at == -1:
+                break
+            if self._index >= 0:
+                self._emit(self.buffer[self._content_start : at])
+            self._index += 1
+            self._content_start = at + len(header)
+            self._scan_pos = self._content_start
+            search_from = self._content_start
+        if self._index == len(self.sections) - 1:
+            self._scan_final()
+
+    def _scan_final(self) -> None:
+        text = self.buffer
+        for i in range(self._scan_pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._depth:
+                self._in_string = True
+            elif ch == "[":
+                self._depth += 1
+            elif ch == "]" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    self.buffer = text[: i + 1]
+                    self._emit(self.buffer[self._content_start :])
+                    self.done = True
+                    return
+        self._scan_pos = len(text)
+
+    def _emit(self, text: str) -> None:
+        if self.on_section:
+            self.on_section(self.sections[self._index], text.strip())
+
+
+def converse_sections(
+    model_id: str,
+    prompt: str,
+    inference_config: dict,
+    sections: list[str],
+    system: str | None = None,
+    on_section=None,
+) -> dict:
+    """Stream a sectioned completion, stopping once its final JSON array closes.
+
+    Returns the same shape as converse(); ``text`` ends at the closing
+    bracket of the last section.
+    """
+    parser = SectionParser(sections, on_section)
+    response = converse_stream(
+        model_id,
+        prompt,
+        inference_config,
+        system,
+        on_text=parser.feed,
+        stop_when=lambda: parser.done,
+    )
+    return {**response, "text": parser.buffer if parser.done else response["text"]}
+
+
+def converse_task(
+    task: str,
+    prompt: str,
+    inference_config: dict,
+    system: str | None = None,
+    sections: list[str] | None = None,
+    on_section=None,
+    on_text=None,
+) -> dict:
+    """Send a prompt to the models routed for ``task``, falling back in order.
+
+    With ``sections`` the completion is streamed as in converse_sections();
+    otherwise, with ``on_text``, it is streamed as in converse_stream().
+    The response gains a ``model`` key naming the model that answered. If
+    every model fails, the last error is raised. Each task gets its own
+    ``bedrock.<task>`` span, as tasks for one post run concurrently.
+    """
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    models = MODEL_ROUTES[task]
+    with tracing.span(f"bedrock.{task}"):
+        for i, model_id in enumerate(models):
+            try:
+                if sections:
+                    response = converse_sections(
+                        model_id, prompt, inference_config, sections, system, on_section
+                    )
+                elif on_text:
+                    response = converse_stream(model_id, prompt, inference_config, system, on_text)
+                else:
+                    response = converse(model_id, prompt, inference_config, system)
+            except (BotoCoreError, ClientError, ReplayMiss):
+                if i + 1 == len(models):
+                    raise
+                tracing.add("fallbacks")
+                continue
+            tracing.annotate(model=model_id)
+            return {**response, "model": model_id}
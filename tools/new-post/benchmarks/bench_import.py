@@ -0,0 +1,107 @@
+"""Import-time regression benchmark for the blog tools.
+
+Starts a fresh interpreter for each sample, so the numbers are what a CLI
+invocation pays before doing any work. Fails (exit 1) if a tool's startup
+overhead over a bare interpreter exceeds the budget, or if importing it
+pulls in a dependency that should only load on the code path using it.
+
+    python tools/new-post/benchmarks/bench_import.py [--runs N] [--budget-ms MS]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent.parent
+NEW_POST_DIR = TOOLS_DIR / "new-post"
+
+# Dependencies that must not be imported at startup.
+HEAVY_MODULES = ("boto3", "botocore", "yt_dlp", "requests", "PIL", "numpy", "scipy")
+
+SETUP = f"import sys; sys.path[:0] = [{str(NEW_POST_DIR)!r}, {str(TOOLS_DIR)!r}]"
+
+TARGETS = {
+    "python (baseline)": [sys.executable, "-c", "pass"],
+    "import new_post": [sys.executable, "-c", f"{SETUP}; import new_post"],
+    "import port_builder_articles": [
+        sys.executable,
+        "-c",
+        f"{SETUP}; import port_builder_articles",
+    ],
+    "new_post.py --help": [sys.executable, str(NEW_POST_DIR / "new_post.py"), "--help"],
+}
+
+LEAK_CHECKS = {
+    "new_post": "new_post",
+    "port_builder_articles": "port_builder_articles",
+}
+
+
+def time_command(argv: list[str], runs: int) -> list[float]:
+    """Wall-clock seconds for ``runs`` fresh executions of ``argv``."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def leaked_modules(module: str) -> list[str]:
+    """Heavy dependencies present in sys.modules after importing ``module``."""
+    code = (
+        f"{SETUP}; import {module}; "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return out.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark blog tool startup time.")
+    parser.add_argument("--runs", type=int, default=10, help="samples per target (default: 10)")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150,
+        help="max median overhead over a bare interpreter (default: 150)",
+    )
+    args = parser.parse_args()
+
+    # One untimed run each so bytecode compilation is not measured
+    for argv in TARGETS.values():
+        time_command(argv, 1)
+
+    results = {label: time_command(argv, args.runs) for label, argv in TARGETS.items()}
+    baseline = statistics.median(results["python (baseline)"])
+
+    failed = False
+    print(f"{'target':<30} {'median':>9} {'min':>9} {'overhead':>9}")
+    for label, samples in results.items():
+        median = statistics.median(samples)
+        overhead = (median - baseline) * 1000
+        over_budget = label != "python (baseline)" and overhead > args.budget_ms
+        failed |= over_budget
+        print(
+            f"{label:<30} {median * 1000:>7.1f}ms {min(samples) * 1000:>7.1f}ms "
+            f"{overhead:>7.1f}ms{'  OVER BUDGET' if over_budget else ''}"
+        )
+
+    for label, module in LEAK_CHECKS.items():
+        leaked = leaked_modules(module)
+        if leaked:
+            failed = True
+            print(f"{label} imports at startup: {', '.join(leaked)}")
+
+    if failed:
+        sys.exit(1)
+    print(f"\nAll targets within {args.budget_ms:.0f}ms of a bare interpreter.")
+
+
+if __name__ == "__main__":
+    main()
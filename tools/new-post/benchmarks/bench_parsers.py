@@ -0,0 +1,241 @@
+"""Micro-benchmarks for the text-processing hot paths of the blog tools.
+
+Each case runs a parser over a recorded fixture from ``fixtures/`` and, for
+the "large" cases, over a bigger input built deterministically from the same
+fixture (a three-hour caption track, a twenty-fold article, and so on).
+Reports per-call latency and throughput, and compares them with
+``baseline.json``.
+
+    python tools/new-post/benchmarks/bench_parsers.py            # compare
+    python tools/new-post/benchmarks/bench_parsers.py --check    # exit 1 on regression
+    python tools/new-post/benchmarks/bench_parsers.py --save-baseline
+
+Baselines are machine-specific: record one before a parser change and
+compare after it on the same machine.
+"""
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+sys.path[:0] = [str(BENCH_DIR.parent), str(BENCH_DIR.parent.parent)]
+
+import port_builder_articles  # noqa: E402
+import new_post  # noqa: E402
+import vtt  # noqa: E402
+
+REPEATS = 5
+TIMESTAMP_RE = re.compile(r"(\d{2}):(\d{2}):(\d{2}\.\d{3})")
+# The engagement-counts block that brackets the article body in a Tavily extract
+BODY_MARKER = "\n* * *\n\n42 7\n"
+
+
+class Case(NamedTuple):
+    name: str
+    func: Callable
+    payload: object
+    size: int  # bytes of input processed per call
+    calls: int = 1  # parser invocations per call of func
+
+
+def fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text()
+
+
+def shift_timestamps(text: str, offset: float) -> str:
+    def shift(match: re.Match) -> str:
+        seconds = int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3))
+        h, rem = divmod(seconds + offset, 3600)
+        m, s = divmod(rem, 60)
+        return f"{int(h):02d}:{int(m):02d}:{s:06.3f}"
+
+    return TIMESTAMP_RE.sub(shift, text)
+
+
+def long_vtt(hours: float) -> str:
+    """Tile the caption fixture, with shifted timestamps, to the given length."""
+    header, cues = fixture("captions.vtt").split("\n\n", 1)
+    *_, last = TIMESTAMP_RE.finditer(cues)
+    span = vtt.parse_timestamp(last.group(0))
+    parts = [header, ""]
+    offset = 0.0
+    while offset < hours * 3600:
+        parts.append(shift_timestamps(cues, offset))
+        offset += span
+    return "\n".join(parts)
+
+
+def split_extract(raw: str) -> tuple[str, str, str]:
+    """Split a Tavily extract into the page head, article body and page tail."""
+    head, _, rest = raw.partition(BODY_MARKER + "\n* * *\n")
+    body, _, tail = rest.rpartition(BODY_MARKER)
+    return head + BODY_MARKER + "\n* * *\n", body, BODY_MARKER + tail
+
+
+def large_extract(copies: int) -> str:
+    head, body, tail = split_extract(fixture("tavily_extract.md"))
+    return head + body * copies + tail
+
+
+def long_description(chapters: int, links: int) -> str:
+    """A description with many chapters and labelled links."""
+    text = fixture("description.txt")
+    intro = text.split("Chapters:")[0]
+    titles = [line.split(" ", 1)[1].lstrip("-–— ") for line in re.findall(r"^\d.*$", text, re.M)]
+    link_lines = re.findall(r"^.+https?://\S+$", text, re.M)
+    lines = [intro, "Chapters:"]
+    for i in range(chapters):
+        minutes, seconds = divmod(i * 37, 60)
+        hours, minutes = divmod(minutes, 60)
+        stamp = f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+        lines.append(f"{stamp} {titles[i % len(titles)]} (part {i})")
+    lines.append("\nLinks:")
+    for i in range(links):
+        lines.append(f"{link_lines[i % len(link_lines)]}?ref={i}")
+    return "\n".join(lines) + "\n"
+
+
+def long_completion(paragraphs: int) -> str:
+    text = fixture("bedrock_completion.txt")
+    summary, _, rest = text.partition("### Key Takeaways")
+    first, body = summary.split("\n", 1)
+    return first + "\n" + body * paragraphs + "### Key Takeaways" + rest
+
+
+def build_cases() -> list[Case]:
+    extract = fixture("tavily_extract.md")
+    big_extract = large_extract(20)
+    body = split_extract(extract)[1]
+    big_body = split_extract(big_extract)[1]
+    captions = fixture("captions.vtt")
+    big_captions = long_vtt(3)
+    description = fixture("description.txt")
+    big_description = long_description(500, 200)
+    completion = fixture("bedrock_completion.txt")
+    big_completion = long_completion(20)
+    titles = fixture("titles.txt").splitlines()
+
+    def slugify_all(titles):
+        return [new_post.slugify(t) for t in titles]
+
+    def slugify_all_builder(titles):
+        return [port_builder_articles.slugify(t) for t in titles]
+
+    def case(name: str, func: Callable, text: str) -> Case:
+        return Case(name, func, text, len(text.encode()))
+
+    titles_size = len("".join(titles).encode())
+    return [
+        case("extract_article", port_builder_articles.extract_article, extract),
+        case("extract_article/large", port_builder_articles.extract_article, big_extract),
+        case("clean_body", port_builder_articles.clean_body, body),
+        case("clean_body/large", port_builder_articles.clean_body, big_body),
+        Case("slugify", slugify_all, titles, titles_size, len(titles)),
+        Case("slugify/builder", slugify_all_builder, titles, titles_size, len(titles)),
+        case("clean_vtt", vtt.clean_vtt, captions),
+        case("clean_vtt/3h", vtt.clean_vtt, big_captions),
+        case("extract_chapters", new_post.extract_chapters, description),
+        case("extract_chapters/large", new_post.extract_chapters, big_description),
+        case("extract_links", new_post.extract_links, description),
+        case("extract_links/large", new_post.extract_links, big_description),
+        case("parse_bedrock_response", new_post.parse_bedrock_response, completion),
+        case("parse_bedrock_response/large", new_post.parse_bedrock_response, big_completion),
+    ]
+
+
+def measure(case: Case) -> dict:
+    """Best and median per-call time over REPEATS timing runs."""
+    timer = timeit.Timer(lambda: case.func(case.payload))
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(REPEATS, number)]
+    best = min(runs)
+    return {
+        "bytes": case.size,
+        "per_call": best / case.calls,
+        "median": statistics.median(runs) / case.calls,
+        "mb_per_s": case.size / best / 1e6,
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def format_size(size: int) -> str:
+    return f"{size / 1e6:.2f}MB" if size >= 1e5 else f"{size / 1e3:.1f}KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the blog tools' parsers.")
+    parser.add_argument("filter", nargs="?", default="", help="only run cases containing this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="record results as the baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown reported as a regression (default: 0.10)",
+    )
+    parser.add_argument("--check", action="store_true", help="exit 1 if any case regressed")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())["cases"]
+
+    cases = [c for c in build_cases() if args.filter in c.name]
+    results = {}
+    regressions = []
+    print(f"{'case':<30} {'input':>8} {'per call':>10} {'median':>10} {'MB/s':>8}  vs baseline")
+    for case in cases:
+        result = results[case.name] = measure(case)
+        line = (
+            f"{case.name:<30} {format_size(result['bytes']):>8} "
+            f"{format_time(result['per_call']):>10} {format_time(result['median']):>10} "
+            f"{result['mb_per_s']:>8.1f}"
+        )
+        old = baseline.get(case.name)
+        if old:
+            change = result["per_call"] / old["per_call"] - 1
+            line += f"  {change:+.1%}"
+            if change > args.threshold:
+                line += "  REGRESSION"
+                regressions.append(case.name)
+            elif change < -args.threshold:
+                line += "  faster"
+        print(line, flush=True)
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cases": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} case(s) more than {args.threshold:.0%} slower than baseline.")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""End-to-end load test of both tools against the local stub services.
+
+Starts stub_services in-process, points new_post and port_builder_articles
+at it, and pushes synthetic videos and articles through their real
+pipelines (batch worker pool and async Tavily/Bedrock pipeline) at each
+concurrency level. Posts, caches, thumbnails, the sync manifest and the
+post index all go to a temporary directory, so the blog is never touched.
+
+    python tools/new-post/benchmarks/load_test.py --items 200 --concurrency 1,4,16 \\
+        --latency bedrock=1.5 --jitter bedrock=1 --throttle bedrock=0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import stub_services
+
+BENCH_DIR = Path(__file__).resolve().parent
+TOOLS_DIR = BENCH_DIR.parent.parent
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def setup_tools(root: Path, base_url: str):
+    """Import both tools with every path and remote endpoint redirected.
+
+    Must run before anything else imports the tools: the cache location and
+    Bedrock endpoint are read from the environment at import time.
+    """
+    os.environ["BLOG_TOOLS_CACHE"] = str(root / "cache")
+    os.environ["AWS_ENDPOINT_URL_BEDROCK_RUNTIME"] = base_url
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "loadtest")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "loadtest")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+    import http_pool
+    import new_post
+    import port_builder_articles
+    import post_index
+    import related_posts
+    import remote_images
+    import search_index
+    import sync_manifest
+
+    posts_dir = root / "_posts"
+    posts_dir.mkdir()
+    tools = (
+        new_post,
+        port_builder_articles,
+        sync_manifest,
+        post_index,
+        related_posts,
+        remote_images,
+        search_index,
+    )
+    for module in tools:
+        module.BLOG_ROOT = root
+        module.POSTS_DIR = posts_dir
+    new_post.THUMBNAILS_DIR = root / "assets" / "images" / "thumbnails"
+    remote_images.IMAGES_DIR = root / "assets" / "images"
+    remote_images.INDEX = remote_images.ImageIndex(root / "remote-images.json")
+
+    manifest = sync_manifest.SyncManifest(root / "sync-manifest.json")
+    index = post_index.PostIndex(posts_dir, root / "cache" / "post-index.json")
+    search = search_index.SearchIndex(
+        root / "assets" / "js" / "data" / "search", root / "search-index.json"
+    )
+    related = related_posts.RelatedPosts(
+        root / "related-posts.json", root / "_data" / "related.json"
+    )
+    for module in (new_post, port_builder_articles):
+        module.RELATED_POSTS = related
+        module.MANIFEST = manifest
+        module.POST_INDEX = index
+        module.SEARCH_INDEX = search
+
+    def extract_info(url: str) -> dict:
+        video_id = new_post.extract_video_id(url)
+        resp = http_pool.get_session().get(f"{base_url}/info/{video_id}.json", timeout=30)
+        resp.raise_for_status()
+        return resp.json()
+
+    new_post.extract_info = extract_info
+    new_post.THUMBNAIL_URL = base_url + "/vi/{video_id}/{quality}.jpg"
+    port_builder_articles.TAVILY_EXTRACT_URL = f"{base_url}/tavily/extract"
+    return new_post, port_builder_articles
+
+
+def timed(func, latencies: list[float]):
+    """Wrap a per-item function so each call's duration is recorded."""
+
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    return wrapper
+
+
+def run_new_post(new_post, items: int, workers: int, tag: str) -> tuple[list[dict], list[float]]:
+    urls = [f"https://www.youtube.com/watch?v={tag}v{i:05d}" for i in range(items)]
+    latencies = []
+    results = new_post.run_batch(urls, workers, process=timed(new_post.create_post, latencies))
+    return results, latencies
+
+
+def run_port(port, items: int, workers: int, tag: str) -> tuple[list[dict], list[float]]:
+    urls = [f"https://builder.aws.com/content/{tag}a{i:05d}/{tag}-article-{i}" for i in range(items)]
+    latencies = []
+    port.TAVILY_CONCURRENCY = port.BEDROCK_CONCURRENCY = workers
+    original = port.port_article
+    port.port_article = timed(original, latencies)
+    try:
+        results = asyncio.run(port.port_articles(urls, "loadtest-key"))
+    finally:
+        port.port_article = original
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test both tools against stub services.")
+    parser.add_argument("--items", type=int, default=100, help="items per run (default: 100)")
+    parser.add_argument(
+        "--concurrency",
+        default="1,4,16",
+        help="comma-separated worker counts to test (default: 1,4,16)",
+    )
+    parser.add_argument(
+        "--tool",
+        choices=("both", "new-post", "port"),
+        default="both",
+        help="which pipeline to drive (default: both)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the temporary blog directory")
+    stub_services.add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = stub_services.start_server(stub_services.faults_from_args(args), seed=args.seed)
+    root = Path(tempfile.mkdtemp(prefix="blog-loadtest-"))
+    new_post, port = setup_tools(root, server.base_url)
+
+    runners = []
+    if args.tool in ("both", "new-post"):
+        runners.append(("new-post", lambda n, w, tag: run_new_post(new_post, n, w, tag)))
+    if args.tool in ("both", "port"):
+        runners.append(("port", lambda n, w, tag: run_port(port, n, w, tag)))
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    print(f"Stub services at {server.base_url}; working in {root}")
+    print(
+        f"\n{'tool':<9} {'workers':>7} {'items':>6} {'ok':>5} {'failed':>6} {'err %':>6} "
+        f"{'items/s':>8} {'p50 s':>7} {'p99 s':>7} {'429s':>6} {'5xxs':>6}"
+    )
+    try:
+        for name, run in runners:
+            for workers in levels:
+                before = server.stats.copy()
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results, latencies = run(args.items, workers, f"{name[0]}{workers}")
+                elapsed = time.perf_counter() - started
+                sent = server.stats - before
+                throttled = sum(n for key, n in sent.items() if key.endswith(" 429"))
+                errors = sum(n for key, n in sent.items() if key.endswith(" 500"))
+                ok = sum(r["status"] == "ok" for r in results)
+                failed = sum(r["status"] == "failed" for r in results)
+                print(
+                    f"{name:<9} {workers:>7} {len(results):>6} {ok:>5} {failed:>6} "
+                    f"{failed / max(1, len(results)):>6.1%} {ok / elapsed:>8.2f} "
+                    f"{percentile(latencies, 50):>7.2f} {percentile(latencies, 99):>7.2f} "
+                    f"{throttled:>6} {errors:>6}",
+                    flush=True,
+                )
+    finally:
+        server.shutdown()
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Local stand-ins for Tavily, Bedrock and YouTube, for load tests.
+
+One threaded HTTP server answers:
+
+    POST /tavily/extract                  Tavily Extract
+    POST /model/<model id>/converse       Bedrock Runtime Converse
+    GET  /info/<video id>.json            a yt-dlp info dict
+    GET  /captions/<video id>.vtt         auto-captions
+    GET  /vi/<video id>/<quality>.jpg     thumbnails
+    GET  /cdn/<name>                      article images (Tavily extracts link here)
+    GET  /stats                           responses sent, by service and status
+
+Responses are built from the benchmark fixtures. Each service can be given
+a latency, a capacity in requests per second beyond which it throttles
+(429, and ThrottlingException for Bedrock), a random throttling rate and
+a failure rate (500). Point the tools at it with
+AWS_ENDPOINT_URL_BEDROCK_RUNTIME for Bedrock and, in-process, by setting
+new_post.THUMBNAIL_URL, new_post.extract_info and
+port_builder_articles.TAVILY_EXTRACT_URL (see load_test.py).
+
+    python tools/new-post/benchmarks/stub_services.py --port 8765 \\
+        --latency bedrock=2 --throttle bedrock=0.05 --fail tavily=0.01
+"""
+
+import argparse
+import io
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+SERVICES = ("tavily", "bedrock", "youtube", "cdn")
+
+ARTICLE_TITLE = "Complete Tutorial: Streaming Agents on AWS"
+REMOTE_IMAGE_RE = re.compile(r"(!\[[^\]]*\]\()https?://[^)\s]*/([^/)\s]+)\)")
+
+
+class Faults:
+    """Latency, throttling and failure settings for one service.
+
+    ``capacity`` (requests per second, 0 for unlimited) is enforced with a
+    token bucket holding one second's worth of requests.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle: float = 0.0,
+        fail: float = 0.0,
+        capacity: float = 0.0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle = throttle
+        self.fail = fail
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def over_capacity(self) -> bool:
+        """Take a token from the bucket; True if there was none."""
+        if not self.capacity:
+            return False
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity)
+        self.updated = now
+        if self.tokens < 1:
+            return True
+        self.tokens -= 1
+        return False
+
+
+def make_thumbnail() -> bytes:
+    """A 480x360 noisy JPEG, so it is well over the tools' minimum size."""
+    from PIL import Image
+
+    rng = random.Random(0)
+    img = Image.frombytes("RGB", (480, 360), bytes(rng.getrandbits(8) for _ in range(480 * 360 * 3)))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=80)
+    return buf.getvalue()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], faults: dict[str, Faults], seed: int = 0):
+        super().__init__(address, StubHandler)
+        self.faults = {name: faults.get(name, Faults()) for name in SERVICES}
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.captions = (FIXTURES_DIR / "captions.vtt").read_bytes()
+        self.description = (FIXTURES_DIR / "description.txt").read_text()
+        self.completion = (FIXTURES_DIR / "bedrock_completion.txt").read_text()
+        self.extract = (FIXTURES_DIR / "tavily_extract.md").read_text()
+        self.thumbnail = make_thumbnail()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def roll(self, service: str) -> tuple[float, str | None]:
+        """Pick this request's delay and injected fault ("throttle", "fail" or None)."""
+        faults = self.faults[service]
+        with self._lock:
+            delay = faults.latency + self._rng.uniform(0, faults.jitter)
+            r = self._rng.random()
+            over_capacity = faults.over_capacity()
+        if over_capacity or r < faults.throttle:
+            return delay, "throttle"
+        if r < faults.throttle + faults.fail:
+            return delay, "fail"
+        return delay, None
+
+    def count(self, service: str, status: int) -> None:
+        with self._lock:
+            self.stats[f"{service} {status}"] += 1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, service: str, status: int, body: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        if service:
+            self.server.count(service, status)
+
+    def send_json(self, service: str, status: int, data, headers: dict | None = None):
+        self.send(service, status, json.dumps(data).encode(), "application/json", headers)
+
+    def injected(self, service: str) -> bool:
+        """Sleep for the service latency and send an injected error, if one is rolled."""
+        delay, fault = self.server.roll(service)
+        if delay:
+            time.sleep(delay)
+        if fault is None:
+            return False
+        if service == "bedrock":
+            error = "ThrottlingException" if fault == "throttle" else "InternalServerException"
+            self.send_json(
+                service,
+                429 if fault == "throttle" else 500,
+                {"message": "Too many requests" if fault == "throttle" else "Internal error"},
+                {"x-amzn-ErrorType": error},
+            )
+        elif fault == "throttle":
+            self.send_json(service, 429, {"detail": {"error": "Rate limit exceeded"}}, {"Retry-After": "1"})
+        else:
+            self.send_json(service, 500, {"detail": {"error": "Internal error"}})
+        return True
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/stats":
+            return self.send_json(None, 200, dict(self.server.stats))
+        match = re.fullmatch(r"/info/([\w-]+)\.json", self.path)
+        if match:
+            if not self.injected("youtube"):
+                self.send_json("youtube", 200, self.video_info(match.group(1)))
+            return
+        match = re.fullmatch(r"/captions/([\w-]+)\.vtt", self.path)
+        if match:
+            if not self.injected("youtube"):
+                self.send("youtube", 200, self.server.captions, "text/vtt; charset=utf-8")
+            return
+        if re.fullmatch(r"/vi/[\w-]+/\w+\.jpg", self.path):
+            if not self.injected("youtube"):
+                self.send("youtube", 200, self.server.thumbnail, "image/jpeg")
+            return
+        if re.fullmatch(r"/cdn/[\w.-]+", self.path):
+            if not self.injected("cdn"):
+                self.send("cdn", 200, self.server.thumbnail, "image/jpeg")
+            return
+        self.send_json(None, 404, {"message": "not found"})
+
+    def do_POST(self):
+        body = self.read_json()
+        if self.path == "/tavily/extract":
+            if not self.injected("tavily"):
+                self.send_json("tavily", 200, self.tavily_extract(body.get("urls", [])))
+            return
+        if re.fullmatch(r"/model/[^/]+/converse", self.path):
+            if not self.injected("bedrock"):
+                self.send_json("bedrock", 200, self.converse(body))
+            return
+        self.send_json(None, 404, {"message": "not found"})
+
+    def video_info(self, video_id: str) -> dict:
+        return {
+            "id": video_id,
+            "title": f"Load test video {video_id}",
+            "description": self.server.description,
+            "upload_date": "20250101",
+            "automatic_captions": {
+                "en": [{"ext": "vtt", "url": f"{self.server.base_url}/captions/{video_id}.vtt"}]
+            },
+        }
+
+    def tavily_extract(self, urls: list[str]) -> dict:
+        results = []
+        for url in urls:
+            name = url.rstrip("/").rsplit("/", 1)[-1]
+            raw = self.server.extract.replace(ARTICLE_TITLE, f"Load test article {name}")
+            raw = REMOTE_IMAGE_RE.sub(rf"\1{self.server.base_url}/cdn/\2)", raw)
+            results.append({"url": url, "raw_content": raw, "images": []})
+        return {"results": results, "failed_results": [], "response_time": 0.1}
+
+    def converse(self, request: dict) -> dict:
+        prompt = request["messages"][0]["content"][0]["text"]
+        text = self.server.completion
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+            "stopReason": "end_turn",
+            "usage": {
+                "inputTokens": len(prompt) // 4,
+                "outputTokens": len(text) // 4,
+                "totalTokens": (len(prompt) + len(text)) // 4,
+            },
+            "metrics": {"latencyMs": 0},
+        }
+
+
+def parse_settings(values: list[str], faults: dict[str, Faults], field: str) -> None:
+    """Apply SERVICE=VALUE options (or a bare VALUE for every service)."""
+    for value in values:
+        name, _, number = value.rpartition("=")
+        for service in (name,) if name else SERVICES:
+            if service not in SERVICES:
+                raise SystemExit(f"Unknown service {service!r}; expected one of {', '.join(SERVICES)}")
+            setattr(faults.setdefault(service, Faults()), field, float(number))
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    for field, help_text in (
+        ("latency", "seconds added to each response"),
+        ("jitter", "extra random delay, up to this many seconds"),
+        ("throttle", "fraction of requests answered 429"),
+        ("fail", "fraction of requests answered 500"),
+        ("capacity", "requests per second served before throttling"),
+    ):
+        parser.add_argument(
+            f"--{field}",
+            action="append",
+            default=[],
+            metavar="[SERVICE=]VALUE",
+            help=f"{help_text} (services: {', '.join(SERVICES)})",
+        )
+
+
+def faults_from_args(args: argparse.Namespace) -> dict[str, Faults]:
+    faults = {}
+    for field in ("latency", "jitter", "throttle", "fail", "capacity"):
+        parse_settings(getattr(args, field), faults, field)
+    return faults
+
+
+def start_server(faults: dict[str, Faults], port: int = 0, seed: int = 0) -> StubServer:
+    """Start a stub server on a background thread and return it."""
+    server = StubServer(("127.0.0.1", port), faults, seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stand-ins for Tavily, Bedrock and YouTube.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0, help="seed for latency jitter and fault rolls")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", args.port), faults_from_args(args), args.seed)
+    print(f"Serving on {server.base_url} (Ctrl-C to stop)")
+    print(f"  export AWS_ENDPOINT_URL_BEDROCK_RUNTIME={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(dict(server.stats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
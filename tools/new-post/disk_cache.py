@@ -0,0 +1,117 @@
+"""Content-addressed on-disk cache for slow network fetches."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+CACHE_ROOT = Path(
+    os.environ.get(
+        "BLOG_TOOLS_CACHE",
+        Path(__file__).resolve().parent.parent.parent / ".tools-cache",
+    )
+)
+
+DAY = 24 * 60 * 60
+
+
+class DiskCache:
+    """A namespaced key/value store of JSON values under ``CACHE_ROOT``.
+
+    Each entry is a file named after the SHA-256 of its key. Entries older
+    than ``ttl`` seconds count as misses. File mtimes record last access, and
+    when the namespace grows past ``max_bytes`` the least recently used
+    entries are evicted. With ``refresh`` set every read misses, so values
+    are fetched again and rewritten.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float | None = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        refresh: bool = False,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._size = None
+
+    @property
+    def root(self) -> Path:
+        return CACHE_ROOT / self.namespace
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def get(self, key: str):
+        """Return the cached value for ``key``, or None on a miss."""
+        if self.refresh:
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if entry.get("key") != key:
+            return None
+        if self.ttl is not None and time.time() - entry["created"] > self.ttl:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry["value"]
+
+    def set(self, key: str, value) -> None:
+        """Store ``value`` (anything JSON-serialisable) under ``key``."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"key": key, "created": time.time(), "value": value})
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        try:
+            old_size = path.stat().st_size
+        except FileNotFoundError:
+            old_size = 0
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(st.st_size for _, st in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under 90% of max_bytes."""
+        entries = sorted(self._entries(), key=lambda e: e[1].st_mtime)
+        size = sum(st.st_size for _, st in entries)
+        target = self.max_bytes * 0.9
+        for path, st in entries:
+            if size <= target:
+                break
+            path.unlink(missing_ok=True)
+            size -= st.st_size
+        self._size = size
@@ -0,0 +1,113 @@
+"""Pooled HTTP session and conditional downloads shared by the blog tools."""
+
+import os
+import tempfile
+import threading
+from email.utils import formatdate
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import ratelimit
+import tracing
+from disk_cache import DiskCache
+
+# Connections kept alive per host; sized for batch runs with several workers.
+POOL_SIZE = 16
+CHUNK_SIZE = 64 * 1024
+
+# ETag / Last-Modified seen for each downloaded URL.
+VALIDATOR_CACHE = DiskCache("http-validators", ttl=None, max_bytes=16 * 1024 * 1024)
+
+if TYPE_CHECKING:
+    import requests
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Return the process-wide session, so requests reuse TLS connections.
+
+    requests is imported on first use rather than with this module.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def classify_error(exc: Exception) -> tuple[str | None, float | None]:
+    """Sort a requests error into throttle, retryable or fatal (see ratelimit.call)."""
+    import requests
+
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        retry_after = ratelimit.parse_retry_after(exc.response.headers.get("Retry-After"))
+        if status == 429:
+            return "throttle", retry_after
+        if status >= 500:
+            return "retry", retry_after
+        return None, None
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return "retry", None
+    return None, None
+
+
+def download(url: str, dest: Path, timeout: float = 30, min_bytes: int = 0) -> str | None:
+    """Stream ``url`` to ``dest``, revalidating any copy already on disk.
+
+    Returns "unchanged" when the server answers 304 Not Modified,
+    "downloaded" when ``dest`` was (re)written, or None when the response
+    was not a 200 or was smaller than ``min_bytes``. The body is written to
+    a temporary file and moved into place, so ``dest`` is never partial.
+    """
+    headers = {}
+    if dest.exists():
+        validators = VALIDATOR_CACHE.get(url) or {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        if not headers:
+            headers["If-Modified-Since"] = formatdate(dest.stat().st_mtime, usegmt=True)
+
+    with get_session().get(url, headers=headers, timeout=timeout, stream=True) as resp:
+        if resp.status_code == 304:
+            return "unchanged"
+        if resp.status_code != 200:
+            return None
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix=".part")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+            tracing.add("bytes", size)
+            if size < min_bytes:
+                os.unlink(tmp)
+                return None
+            os.replace(tmp, dest)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+        VALIDATOR_CACHE.set(
+            url,
+            {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            },
+        )
+    return "downloaded"
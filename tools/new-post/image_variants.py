@@ -0,0 +1,190 @@
+"""Generate responsive WebP/AVIF variants of the blog's images.
+
+Pillow and the process pool are imported on first use, so importing this
+module (as new_post does) costs nothing until an image is processed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+BLOG_ROOT = Path(__file__).resolve().parent.parent.parent
+IMAGES_DIR = BLOG_ROOT / "assets" / "images"
+VARIANTS_DIR = IMAGES_DIR / "variants"
+MANIFEST_PATH = BLOG_ROOT / "_data" / "image_variants.json"
+
+SOURCE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+WIDTHS = (480, 960, 1600)
+# Listed in order of preference: browsers take the first <source> they support.
+FORMATS = {
+    "avif": {"quality": 55},
+    "webp": {"quality": 80, "method": 6},
+}
+
+_manifest_lock = threading.Lock()
+
+
+def site_path(path: Path) -> str:
+    """The URL path Jekyll serves a file under."""
+    return "/" + str(path.relative_to(BLOG_ROOT))
+
+
+def source_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def available_formats() -> list[str]:
+    """Output formats this Pillow build can encode."""
+    from PIL import features
+
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+
+def render_variants(path: Path, digest: str, formats: list[str]) -> dict:
+    """Write every width/format variant of one image and describe them.
+
+    Runs in a worker process. Widths wider than the source are skipped and
+    the source width itself is always included.
+    """
+    from PIL import Image
+
+    rel = path.relative_to(IMAGES_DIR).with_suffix("")
+    out_dir = VARIANTS_DIR / rel
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(path) as img:
+        img.load()
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        width, height = img.size
+        widths = sorted({w for w in WIDTHS if w < width} | {width})
+
+        sources = []
+        for fmt in formats:
+            srcset = []
+            for w in widths:
+                resized = img if w == width else img.resize(
+                    (w, max(1, round(height * w / width))), Image.LANCZOS
+                )
+                dest = out_dir / f"{w}.{fmt}"
+                resized.save(dest, format=fmt.upper(), **FORMATS[fmt])
+                srcset.append(f"{site_path(dest)} {w}w")
+            sources.append({"type": f"image/{fmt}", "srcset": ", ".join(srcset)})
+
+    return {"hash": digest, "width": width, "height": height, "sources": sources}
+
+
+def is_current(entry: dict | None, digest: str, formats: list[str]) -> bool:
+    """True if the manifest entry was built from this exact source and its files exist."""
+    if not entry or entry["hash"] != digest:
+        return False
+    if [s["type"] for s in entry["sources"]] != [f"image/{fmt}" for fmt in formats]:
+        return False
+    return all(
+        (BLOG_ROOT / item.split(" ")[0].lstrip("/")).exists()
+        for source in entry["sources"]
+        for item in source["srcset"].split(", ")
+    )
+
+
+def find_sources() -> list[Path]:
+    """Every raster image under assets/images, excluding generated variants."""
+    return sorted(
+        p
+        for p in IMAGES_DIR.rglob("*")
+        if p.suffix.lower() in SOURCE_SUFFIXES and VARIANTS_DIR not in p.parents
+    )
+
+
+def load_manifest() -> dict:
+    try:
+        return json.loads(MANIFEST_PATH.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(manifest: dict) -> None:
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=MANIFEST_PATH.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+        f.write("\n")
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def build_variants(
+    paths: list[Path] | None = None, workers: int | None = None, force: bool = False
+) -> dict:
+    """Bring variants and the manifest up to date.
+
+    With ``paths`` only those images are considered; otherwise every image
+    under assets/images is, and manifest entries for deleted images are
+    dropped. Images whose source hash matches the manifest are skipped.
+    Safe to call from several threads. Returns counts of built and skipped
+    images.
+    """
+    formats = available_formats()
+    full_run = paths is None
+    paths = find_sources() if full_run else [Path(p).resolve() for p in paths]
+
+    with _manifest_lock:
+        manifest = load_manifest()
+    jobs = {}
+    for path in paths:
+        key = site_path(path)
+        digest = source_hash(path)
+        if force or not is_current(manifest.get(key), digest, formats):
+            jobs[key] = (path, digest)
+
+    built = {}
+    if len(jobs) == 1:
+        key, (path, digest) = next(iter(jobs.items()))
+        built[key] = render_variants(path, digest, formats)
+    elif jobs:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                key: pool.submit(render_variants, path, digest, formats)
+                for key, (path, digest) in jobs.items()
+            }
+            built = {key: future.result() for key, future in futures.items()}
+
+    with _manifest_lock:
+        manifest = load_manifest()
+        manifest.update(built)
+        if full_run:
+            live = {site_path(p) for p in paths}
+            manifest = {k: v for k, v in manifest.items() if k in live}
+        save_manifest(manifest)
+    return {"built": len(jobs), "skipped": len(paths) - len(jobs)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="optimize-images",
+        description="Generate responsive WebP/AVIF variants of images under assets/images.",
+    )
+    parser.add_argument("paths", nargs="*", type=Path, help="images to process (default: all)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rebuild even unchanged images")
+    args = parser.parse_args()
+
+    formats = available_formats()
+    if not formats:
+        print("This Pillow build cannot encode WebP or AVIF.")
+        sys.exit(1)
+    print(f"Formats: {', '.join(formats)}; widths: {', '.join(map(str, WIDTHS))}")
+
+    counts = build_variants(args.paths or None, workers=args.workers, force=args.force)
+    print(f"{counts['built']} images processed, {counts['skipped']} unchanged.")
+    print(f"Manifest: {MANIFEST_PATH.relative_to(BLOG_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
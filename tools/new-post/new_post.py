@@ -1,21 +1,100 @@
 """CLI tool to create a blog post from a YouTube video URL."""
 
+import argparse
+import functools
 import json
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
-import boto3
-import requests
-import yt_dlp
-
+import bedrock_runtime
+import http_pool
+import stages
+import tracing
+import vtt
+from disk_cache import DAY, DiskCache
+from post_index import POST_INDEX
+from related_posts import RELATED_POSTS
+from search_index import SEARCH_INDEX
+from sync_manifest import MANIFEST, fingerprint, youtube_key
 
 BLOG_ROOT = Path(__file__).resolve().parent.parent.parent
 POSTS_DIR = BLOG_ROOT / "_posts"
 THUMBNAILS_DIR = BLOG_ROOT / "assets" / "images" / "thumbnails"
+THUMBNAIL_URL = "https://img.youtube.com/vi/{video_id}/{quality}.jpg"
+VIDEO_URL = "https://www.youtube.com/watch?v={video_id}"
+
+DEFAULT_WORKERS = 4
+
+# Transcripts up to this many characters go to Bedrock in a single prompt.
+# Longer ones are summarised in overlapping chunks first (map), and the
+# chunk notes replace the transcript in the final prompt (reduce).
+TRANSCRIPT_LIMIT = 12000
+CHUNK_CHARS = 10000
+CHUNK_OVERLAP = 800
+MAP_WORKERS = 6
+
+# Stream Bedrock output (set by --stream): summary paragraphs and metadata
+# sections are reported as they complete, and metadata generation stops
+# once the TAGS array closes.
+STREAM_RESPONSES = False
+
+# Most common existing tags offered to the model when tagging a post.
+TAG_VOCABULARY_SIZE = 40
+METADATA_SECTIONS = ["SEO_DESCRIPTION", "CATEGORIES", "TAGS"]
+# Metadata is tagged from the start of the transcript (or notes).
+METADATA_SOURCE_CHARS = 6000
+SUMMARY_MAX_TOKENS = 1024
+METADATA_MAX_TOKENS = 512
+
+# The fixed instructions for each kind of request go in the system prompt,
+# ahead of the video itself (in the user message).
+NOTES_INSTRUCTIONS = """You are taking notes on one part of the transcript of a YouTube video. Consecutive parts overlap slightly.
+
+Write concise notes (at most 200 words) on what this part covers: topics, technologies, demos, and any conclusions. Use plain sentences, no headings."""
+
+SUMMARY_INSTRUCTIONS = """You are helping create blog posts for YouTube videos. The blog belongs to Mike Chambers, an AI/ML engineer.
+
+You will be given a video's title, description and transcript (or notes covering the whole video). A transcript may be split under the video's chapter headings, written as "[MM:SS] Chapter title". Write a summary of the video content (2-3 paragraphs). Write for a technical audience. Use third person ("In this video, Mike..."). Make it engaging and informative — this replaces a raw transcript on the blog. Do NOT use markdown headings.
 
-BEDROCK_MODEL_ID = "global.anthropic.claude-opus-4-6-v1"
+Return only the summary paragraphs."""
+
+METADATA_INSTRUCTIONS = """You are generating metadata for blog posts about YouTube videos. The blog belongs to Mike Chambers, an AI/ML engineer.
+
+You will be given a video's title, description and the start of its transcript. Provide:
+
+1. An SEO meta description (max 160 characters). This should be a concise, compelling summary.
+
+2. Suggested categories as a JSON array. Choose from: ["AI", "Tutorials", "Agents"]. Most posts use ["AI", "Tutorials"]. Use ["AI", "Agents"] only if the video is primarily about AI agents.
+
+3. Suggested tags as a JSON array. Always include "video". Choose relevant tags from the ones already used on the blog: {known_tags}. Add new short lowercase tags if needed.
+
+Return your response in this exact format:
+
+SEO_DESCRIPTION:
+<your seo description here>
+
+CATEGORIES:
+<json array>
+
+TAGS:
+<json array>"""
+
+# yt-dlp info is refreshed weekly; captions themselves rarely change once
+# published. The caption URLs in the info are signed and expire within hours,
+# so a fetch refused with one of these statuses re-extracts the info once.
+INFO_CACHE = DiskCache("yt-info", ttl=7 * DAY)
+TRANSCRIPT_CACHE = DiskCache("yt-captions", ttl=30 * DAY)
+EXPIRED_CAPTION_STATUSES = {403, 404, 410}
+
+# Channel URL shapes accepted by --playlist, besides /playlist?list=...
+CHANNEL_PREFIXES = ("/@", "/channel/", "/c/", "/user/")
+# Placeholder titles of listing entries that cannot be fetched.
+UNAVAILABLE_TITLES = {"[Private video]", "[Deleted video]"}
 
 
 def extract_video_id(url: str) -> str:
@@ -31,45 +110,132 @@ def extract_video_id(url: str) -> str:
     raise ValueError(f"Could not extract video ID from: {url}")
 
 
-def fetch_metadata(url: str) -> dict:
-    """Fetch video metadata and auto-captions via yt-dlp."""
+def is_listing_url(url: str) -> bool:
+    """True for a YouTube playlist or channel URL (rather than a single video)."""
+    parsed = urlparse(url)
+    if parsed.hostname not in ("www.youtube.com", "youtube.com", "m.youtube.com"):
+        return False
+    if parsed.path == "/playlist":
+        return "list" in parse_qs(parsed.query)
+    return parsed.path.startswith(CHANNEL_PREFIXES)
+
+
+def listing_url(url: str) -> str:
+    """Point a bare channel URL at its Videos tab.
+
+    A channel's own page lists its tabs (Videos, Shorts, Live) rather than
+    videos, so flat extraction of it would return tab links.
+    """
+    parsed = urlparse(url)
+    parts = parsed.path.rstrip("/").split("/")
+    # /@handle, or /channel/<id>, /c/<name>, /user/<name>
+    is_channel_root = len(parts) == 2 if parts[1].startswith("@") else len(parts) == 3
+    if parsed.path.startswith(CHANNEL_PREFIXES) and is_channel_root:
+        return parsed._replace(path=parsed.path.rstrip("/") + "/videos").geturl()
+    return url
+
+
+def list_videos(url: str) -> list[dict]:
+    """List a playlist's or channel's videos as ``{"id", "title"}``, newest first.
+
+    Uses yt-dlp's flat extraction, which reads only the listing pages
+    instead of resolving every video, so even large channels take seconds.
+    Upcoming and live streams, and private or deleted videos, are left out.
+    """
+    import yt_dlp  # slow to import; only needed here and on an info-cache miss
+
     ydl_opts = {
         "quiet": True,
         "no_warnings": True,
         "skip_download": True,
-        "writeautomaticsub": True,
-        "subtitleslangs": ["en"],
-        "subtitlesformat": "vtt",
+        "extract_flat": "in_playlist",
     }
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=False)
-    return info
+        listing = ydl.extract_info(listing_url(url), download=False)
 
-
-def clean_vtt(vtt_text: str) -> str:
-    """Convert VTT subtitle text to plain text, removing timestamps and duplicates."""
-    lines = []
-    seen = set()
-    for line in vtt_text.splitlines():
-        # Skip VTT headers, timestamps, and blank lines
-        if (
-            line.startswith("WEBVTT")
-            or line.startswith("Kind:")
-            or line.startswith("Language:")
-            or "-->" in line
-            or not line.strip()
-        ):
+    videos = []
+    pending = list(listing.get("entries") or [])
+    while pending:
+        entry = pending.pop(0)
+        if entry is None:
+            continue
+        if entry.get("entries"):
+            pending[:0] = entry["entries"]
+            continue
+        if entry.get("ie_key", "Youtube") != "Youtube" or not entry.get("id"):
+            continue
+        if entry.get("live_status") in ("is_upcoming", "is_live"):
             continue
-        # Strip VTT tags like <c> </c> <00:00:01.234>
-        cleaned = re.sub(r"<[^>]+>", "", line).strip()
-        if cleaned and cleaned not in seen:
-            seen.add(cleaned)
-            lines.append(cleaned)
-    return " ".join(lines)
+        if entry.get("title") in UNAVAILABLE_TITLES:
+            continue
+        videos.append({"id": entry["id"], "title": entry.get("title") or ""})
+    return videos
 
 
-def get_transcript(info: dict) -> str:
-    """Download and clean auto-captions from yt-dlp info."""
+@tracing.traced("youtube.metadata")
+def fetch_metadata(url: str) -> dict:
+    """Fetch video metadata and auto-captions via yt-dlp, cached by video ID."""
+    video_id = extract_video_id(url)
+    info = INFO_CACHE.get(video_id)
+    if info is not None:
+        tracing.add("cache_hits")
+        return info
+
+    info = extract_info(url)
+    INFO_CACHE.set(video_id, info)
+    return info
+
+
+def extract_info(url: str) -> dict:
+    """Ask yt-dlp for a video's info dict, including caption URLs."""
+    import yt_dlp  # slow to import; only needed on a cache miss
+
+    ydl_opts = {
+        "quiet": True,
+        "no_warnings": True,
+        "skip_download": True,
+        "writeautomaticsub": True,
+        "subtitleslangs": ["en"],
+        "subtitlesformat": "vtt",
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        return ydl.sanitize_info(ydl.extract_info(url, download=False))
+
+
+@tracing.traced("youtube.captions")
+def get_transcript_segments(info: dict, refetch: bool = True) -> list[vtt.Segment]:
+    """Stream and parse auto-captions from yt-dlp info into timed segments.
+
+    If the caption URL has expired (see EXPIRED_CAPTION_STATUSES) and
+    ``refetch`` is set, the info is extracted again, replaced in INFO_CACHE,
+    and the fetch retried once with the fresh URL.
+    """
+    cached = TRANSCRIPT_CACHE.get(info["id"])
+    if cached is not None:
+        tracing.add("cache_hits")
+        return [vtt.Segment(*s) for s in cached]
+
+    url = caption_url(info)
+    if url is None:
+        return []
+    session = http_pool.get_session()
+    with session.get(url, timeout=30, stream=True) as resp:
+        if not (refetch and resp.status_code in EXPIRED_CAPTION_STATUSES):
+            resp.raise_for_status()
+            resp.encoding = resp.encoding or "utf-8"
+            segments = list(vtt.iter_segments(resp.iter_lines(decode_unicode=True)))
+            tracing.add("bytes", resp.raw.tell())
+            TRANSCRIPT_CACHE.set(info["id"], [list(s) for s in segments])
+            return segments
+
+    tracing.add("refetches")
+    info = extract_info(VIDEO_URL.format(video_id=info["id"]))
+    INFO_CACHE.set(info["id"], info)
+    return get_transcript_segments(info, refetch=False)
+
+
+def caption_url(info: dict) -> str | None:
+    """The English VTT caption URL in yt-dlp info, preferring auto-captions."""
     # Try automatic captions first, then regular subtitles
     for caption_key in ("automatic_captions", "subtitles"):
         captions = info.get(caption_key, {})
@@ -78,72 +244,168 @@ def get_transcript(info: dict) -> str:
         # Find a VTT or srv format URL
         for fmt in captions["en"]:
             if fmt.get("ext") == "vtt" or "vtt" in fmt.get("url", ""):
-                resp = requests.get(fmt["url"], timeout=30)
-                resp.raise_for_status()
-                return clean_vtt(resp.text)
-    return ""
+                return fmt["url"]
+    return None
 
 
+def get_transcript(info: dict) -> str:
+    """Download and clean auto-captions from yt-dlp info, split by chapter if it has them."""
+    chapters = extract_chapters(info.get("description", ""))
+    return transcript_text(get_transcript_segments(info), chapters)
+
+
+def transcript_text(segments: list[vtt.Segment], chapters: list[dict]) -> str:
+    """The transcript for a prompt, under a heading per chapter when there are chapters.
+
+    Timestamps in a description that are not in increasing order are not
+    chapters, and the transcript is returned as plain text.
+    """
+    starts = [vtt.parse_timestamp(ch["timestamp"]) for ch in chapters]
+    if not segments or len(chapters) < 2 or any(a >= b for a, b in zip(starts, starts[1:])):
+        return vtt.segments_text(segments)
+    return "\n\n".join(
+        f"[{ch['timestamp']}] {ch['title']}\n{ch['text']}"
+        for ch in vtt.align_chapters(chapters, segments)
+    )
+
+
+@tracing.traced("youtube.thumbnail")
 def download_thumbnail(video_id: str) -> Path:
-    """Download the highest-resolution thumbnail available."""
-    THUMBNAILS_DIR.mkdir(parents=True, exist_ok=True)
+    """Download the highest-resolution thumbnail available.
+
+    An existing thumbnail is revalidated rather than fetched again; its
+    responsive variants are left to optimize-images (run in CI).
+    """
     dest = THUMBNAILS_DIR / f"{video_id}.jpg"
 
     for quality in ("maxresdefault", "hqdefault"):
-        url = f"https://img.youtube.com/vi/{video_id}/{quality}.jpg"
-        resp = requests.get(url, timeout=15)
-        if resp.status_code == 200 and len(resp.content) > 1000:
-            dest.write_bytes(resp.content)
+        url = THUMBNAIL_URL.format(video_id=video_id, quality=quality)
+        if http_pool.download(url, dest, timeout=15, min_bytes=1000):
             return dest
 
     raise RuntimeError(f"Could not download thumbnail for {video_id}")
 
 
-def call_bedrock(title: str, description: str, transcript: str) -> dict:
-    """Call Bedrock to generate summary, SEO description, categories, and tags."""
-    prompt = f"""You are helping create a blog post for a YouTube video. The blog belongs to Mike Chambers, an AI/ML engineer.
-
-**Video Title:** {title}
+def chunk_transcript(
+    transcript: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP
+) -> list[str]:
+    """Split a transcript into overlapping chunks, breaking at spaces."""
+    chunks = []
+    start = 0
+    while start < len(transcript):
+        end = min(start + size, len(transcript))
+        if end < len(transcript):
+            space = transcript.rfind(" ", start + size // 2, end)
+            if space != -1:
+                end = space
+        chunks.append(transcript[start:end].strip())
+        if end >= len(transcript):
+            break
+        next_start = end - overlap
+        space = transcript.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+    return chunks
+
+
+def summarise_chunk(title: str, chunk: str, part: int, total: int) -> str:
+    """Take notes on one transcript chunk (the map step)."""
+    prompt = f"""**Video Title:** {title}
+
+**Transcript part {part} of {total}:**
+{chunk}"""
+    response = bedrock_runtime.converse_task("notes", prompt, {"maxTokens": 512}, NOTES_INSTRUCTIONS)
+    return response["text"].strip()
+
+
+def summarise_transcript(title: str, transcript: str) -> str:
+    """Summarise a long transcript chunk by chunk, concurrently, keeping order."""
+    chunks = chunk_transcript(transcript)
+    with ThreadPoolExecutor(max_workers=min(MAP_WORKERS, len(chunks))) as pool:
+        notes = list(
+            pool.map(
+                lambda item: summarise_chunk(title, item[1], item[0], len(chunks)),
+                enumerate(chunks, start=1),
+            )
+        )
+    return "\n\n".join(f"Part {i}: {n}" for i, n in enumerate(notes, start=1))
+
+
+def video_prompt(title: str, description: str, source: str) -> str:
+    """The user message about a video: its title and description, then ``source``."""
+    return f"""**Video Title:** {title}
 
 **Video Description:**
 {description}
 
-**Transcript:**
-{transcript[:12000]}
-
-Based on the above, please provide:
-
-1. A written summary of the video content (2-3 paragraphs). Write for a technical audience. Use third person ("In this video, Mike..."). Make it engaging and informative — this replaces a raw transcript on the blog. Do NOT use markdown headings in the summary.
-
-2. An SEO meta description (max 160 characters). This should be a concise, compelling summary.
-
-3. Suggested categories as a JSON array. Choose from: ["AI", "Tutorials", "Agents"]. Most posts use ["AI", "Tutorials"]. Use ["AI", "Agents"] only if the video is primarily about AI agents.
+{source}"""
 
-4. Suggested tags as a JSON array. Always include "video". Choose relevant tags from common ones like: amazon-bedrock, claude, agents, tools, mcp, rag, memory, streaming, inference, code-interpreter, agentcore, dynamodb, partyrock, mistral. Add new short lowercase tags if needed.
 
-Return your response in this exact format:
-
-SUMMARY:
-<your summary paragraphs here>
-
-SEO_DESCRIPTION:
-<your seo description here>
-
-CATEGORIES:
-<json array>
+def metadata_instructions() -> str:
+    """METADATA_INSTRUCTIONS with the blog's most used tags filled in."""
+    known_tags = ", ".join(POST_INDEX.tag_vocabulary(TAG_VOCABULARY_SIZE))
+    return METADATA_INSTRUCTIONS.format(known_tags=known_tags)
 
-TAGS:
-<json array>"""
 
-    client = boto3.client("bedrock-runtime")
-    response = client.converse(
-        modelId=BEDROCK_MODEL_ID,
-        messages=[{"role": "user", "content": [{"text": prompt}]}],
-        inferenceConfig={"maxTokens": 1024},
-    )
+@tracing.traced("bedrock")
+def call_bedrock(title: str, description: str, transcript: str, log=print) -> dict:
+    """Call Bedrock to generate summary, SEO description, categories, and tags.
 
-    text = response["output"]["message"]["content"][0]["text"]
-    return parse_bedrock_response(text)
+    The summary (large model) and the metadata (fast model) are separate
+    requests, made concurrently; see bedrock_runtime.MODEL_ROUTES.
+    Transcripts longer than TRANSCRIPT_LIMIT are map-reduced first: chunk
+    notes are generated in parallel and stand in for the transcript. In
+    streaming mode each summary paragraph and metadata section is logged as
+    soon as it is complete.
+    """
+    tracing.annotate(transcript_chars=len(transcript))
+    if len(transcript) > TRANSCRIPT_LIMIT:
+        notes = summarise_transcript(title, transcript)
+        source = f"**Transcript notes (covering the whole video, in order):**\n{notes}"
+    else:
+        source = f"**Transcript:**\n{transcript}"
+
+    def summary() -> str:
+        pending = ""
+
+        def on_text(delta: str) -> None:
+            # Log each paragraph of the summary as soon as it is complete
+            nonlocal pending
+            *paragraphs, pending = (pending + delta).split("\n\n")
+            for paragraph in paragraphs:
+                if paragraph.strip():
+                    log(f"  SUMMARY: {preview(paragraph)}")
+
+        response = bedrock_runtime.converse_task(
+            "summary",
+            video_prompt(title, description, source),
+            {"maxTokens": SUMMARY_MAX_TOKENS},
+            SUMMARY_INSTRUCTIONS,
+            on_text=on_text if STREAM_RESPONSES else None,
+        )
+        if pending.strip():
+            log(f"  SUMMARY: {preview(pending)}")
+        return response["text"].strip()
+
+    def metadata() -> str:
+        response = bedrock_runtime.converse_task(
+            "metadata",
+            video_prompt(title, description, source[:METADATA_SOURCE_CHARS]),
+            {"maxTokens": METADATA_MAX_TOKENS},
+            metadata_instructions(),
+            sections=METADATA_SECTIONS if STREAM_RESPONSES else None,
+            on_section=lambda name, text: log(f"  {name}: {preview(text)}"),
+        )
+        return response["text"]
+
+    results = stages.run_stages({"summary": (summary, ()), "metadata": (metadata, ())})
+    with tracing.span("parse"):
+        return {**parse_bedrock_response(results["metadata"]), "summary": results["summary"]}
+
+
+def preview(text: str, width: int = 72) -> str:
+    """Collapse text onto one line, truncated for progress output."""
+    line = " ".join(text.split())
+    return line if len(line) <= width else line[: width - 3] + "..."
 
 
 def parse_bedrock_response(text: str) -> dict:
@@ -287,66 +549,392 @@ def build_post(
     return "\n".join(lines)
 
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: uv run new-post <youtube-url>")
-        sys.exit(1)
+class DuplicatePost(Exception):
+    """Raised inside create_post's stages to abandon a duplicate video."""
 
-    url = sys.argv[1]
 
-    # 1. Extract video ID
-    video_id = extract_video_id(url)
-    print(f"Video ID: {video_id}")
+@tracing.traced("video")
+def create_post(url: str, log=print, force: bool = False) -> dict:
+    """Run the full pipeline for one video and write its post.
 
-    # 2. Fetch metadata via yt-dlp
-    print("Fetching video metadata...")
-    info = fetch_metadata(url)
+    Stages run as soon as their inputs are ready: the thumbnail downloads
+    while yt-dlp runs, and chapters and links are extracted while Bedrock
+    generates, so latency is that of metadata, transcript and Bedrock.
+    Returns a summary of what was written; progress goes through ``log``.
+    Unless ``force`` is set, a video whose title matches (or nearly matches)
+    an existing post from another source is skipped.
+    """
+    video_id = extract_video_id(url)
+    key = youtube_key(video_id)
+    tracing.annotate(video_id=video_id)
+    log(f"Video ID: {video_id}")
+
+    def metadata() -> dict:
+        log("Fetching video metadata...")
+        info = fetch_metadata(url)
+        title = info.get("title", "Untitled")
+        log(f"Title: {title}")
+        duplicate = POST_INDEX.find_duplicate(title, source=key)
+        if duplicate and duplicate["source"] != key and not force:
+            raise DuplicatePost(duplicate["path"])
+        return info
+
+    def thumbnail() -> Path:
+        log("Downloading thumbnail...")
+        thumb_path = download_thumbnail(video_id)
+        log(f"Thumbnail saved: {thumb_path.relative_to(BLOG_ROOT)}")
+        return thumb_path
+
+    def transcript(metadata: dict) -> str:
+        log("Downloading transcript...")
+        text = get_transcript(metadata)
+        if not text:
+            log("Warning: No English auto-captions found. Proceeding without transcript.")
+        return text
+
+    def summary(metadata: dict, transcript: str) -> dict:
+        log("Generating summary via Bedrock...")
+        return call_bedrock(
+            metadata.get("title", "Untitled"), metadata.get("description", ""), transcript, log=log
+        )
+
+    def description_links(metadata: dict) -> tuple[list[dict], list[dict]]:
+        description = metadata.get("description", "")
+        with tracing.span("parse"):
+            return extract_chapters(description), extract_links(description)
+
+    try:
+        results = stages.run_stages(
+            {
+                "metadata": (metadata, ()),
+                "thumbnail": (thumbnail, ()),
+                "transcript": (transcript, ("metadata",)),
+                "summary": (summary, ("metadata", "transcript")),
+                "description_links": (description_links, ("metadata",)),
+            }
+        )
+    except DuplicatePost as e:
+        log(f"Looks like a duplicate of {e}; skipping.")
+        return {"video_id": video_id, "skipped": f"duplicate of {e}"}
+
+    info = results["metadata"]
+    bedrock = results["summary"]
+    chapters, links = results["description_links"]
     title = info.get("title", "Untitled")
-    description = info.get("description", "")
     upload_date_raw = info.get("upload_date", "")  # YYYYMMDD format
     if upload_date_raw:
         upload_date = f"{upload_date_raw[:4]}-{upload_date_raw[4:6]}-{upload_date_raw[6:8]}"
     else:
-        from datetime import date
         upload_date = date.today().isoformat()
+    log(f"Upload date: {upload_date}")
 
-    print(f"Title: {title}")
-    print(f"Upload date: {upload_date}")
+    # Build and write the post
+    slug = slugify(title)
+    filename = f"{upload_date}-{slug}.md"
+    post_path = POSTS_DIR / filename
 
-    # 3. Download transcript
-    print("Downloading transcript...")
-    transcript = get_transcript(info)
-    if not transcript:
-        print("Warning: No English auto-captions found. Proceeding without transcript.")
+    with tracing.span("write") as span:
+        post_content = build_post(video_id, title, upload_date, bedrock, chapters, links)
+        post_path.write_text(post_content)
+        span.add("bytes", len(post_content.encode()))
+        previous = MANIFEST.record(key, post_path, video_fingerprint(info))
+        POST_INDEX.add(post_path)
+        if previous:
+            # The title or date changed; don't leave the old post published too.
+            previous.unlink()
+            POST_INDEX.remove(previous)
+            log(f"Removed previous post: {previous.relative_to(BLOG_ROOT)}")
+        SEARCH_INDEX.update([post_path, previous] if previous else [post_path])
+
+    return {
+        "video_id": video_id,
+        "title": title,
+        "post_path": post_path,
+        "replaced": previous,
+        "categories": bedrock["categories"],
+        "tags": bedrock["tags"],
+        "chapters": chapters,
+        "links": links,
+    }
 
-    # 4. Download thumbnail
-    print("Downloading thumbnail...")
-    thumb_path = download_thumbnail(video_id)
-    print(f"Thumbnail saved: {thumb_path.relative_to(BLOG_ROOT)}")
 
-    # 5. Call Bedrock for summary
-    print("Generating summary via Bedrock...")
-    bedrock = call_bedrock(title, description, transcript)
+def video_fingerprint(info: dict) -> str:
+    """Fingerprint the parts of a video that its post is generated from."""
+    return fingerprint(info.get("title"), info.get("description"), info.get("upload_date"))
 
-    # 6. Extract chapters and links from description
-    chapters = extract_chapters(description)
-    links = extract_links(description)
 
-    # 7. Build and write the post
-    slug = slugify(title)
-    filename = f"{upload_date}-{slug}.md"
-    post_path = POSTS_DIR / filename
+def sync_video(url: str, log=print) -> dict:
+    """Create a post only if the video is new or has changed since its post.
 
-    post_content = build_post(video_id, title, upload_date, bedrock, chapters, links)
-    post_path.write_text(post_content)
+    Posts that were edited by hand after generation are never overwritten.
+    """
+    video_id = extract_video_id(url)
+    info = fetch_metadata(url)
+    status = MANIFEST.status(youtube_key(video_id), video_fingerprint(info))
+    if status == "edited":
+        log("Source changed, but the post has been edited by hand; leaving it alone.")
+    if status in ("unchanged", "adopted", "edited"):
+        return {"video_id": video_id, "skipped": f"{status} since last sync"}
+    return create_post(url, log=log)
 
-    print(f"\nPost created: {post_path.relative_to(BLOG_ROOT)}")
-    print(f"Categories: {bedrock['categories']}")
-    print(f"Tags: {bedrock['tags']}")
-    if chapters:
-        print(f"Chapters: {len(chapters)}")
-    if links:
-        print(f"Links: {len(links)}")
+
+def read_urls(source: str) -> list[str]:
+    """Read one URL per line from a file, or from stdin when source is "-".
+
+    Blank lines and ``#`` comments are ignored.
+    """
+    if source == "-":
+        text = sys.stdin.read()
+    else:
+        text = Path(source).read_text()
+    urls = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+
+def run_batch(
+    urls: list[str],
+    workers: int = DEFAULT_WORKERS,
+    process=create_post,
+    skip_published: bool = True,
+) -> list[dict]:
+    """Process many videos in a bounded worker pool.
+
+    ``process`` is create_post or sync_video. Each video runs
+    independently: a failure is recorded against that video and the rest
+    of the batch carries on. Non-YouTube URLs, repeated videos and, with
+    ``skip_published``, videos the manifest already has a post for are
+    skipped up front. Related posts are updated once, at the end.
+    """
+    results = []
+    jobs = {}
+    for url in urls:
+        try:
+            video_id = extract_video_id(url)
+        except (ValueError, KeyError, IndexError):
+            results.append({"url": url, "status": "skipped", "error": "not a YouTube video URL"})
+            continue
+        if video_id in jobs:
+            results.append({"url": url, "status": "skipped", "error": "duplicate video"})
+            continue
+        if skip_published and MANIFEST.is_published(youtube_key(video_id)):
+            results.append(
+                {"url": url, "video_id": video_id, "status": "skipped", "error": "already published"}
+            )
+            continue
+        jobs[video_id] = url
+
+    def run_one(video_id: str, url: str) -> dict:
+        def log(msg: str) -> None:
+            print(f"[{video_id}] {msg}")
+
+        started = time.monotonic()
+        try:
+            post = process(url, log=log)
+        except Exception as e:
+            log(f"FAILED: {e}")
+            return {
+                "url": url,
+                "video_id": video_id,
+                "status": "failed",
+                "error": f"{type(e).__name__}: {e}",
+                "seconds": time.monotonic() - started,
+            }
+        if post.get("skipped"):
+            return {"url": url, "video_id": video_id, "status": "skipped", "error": post["skipped"]}
+        log(f"Post created: {post['post_path'].relative_to(BLOG_ROOT)}")
+        return {
+            "url": url,
+            "video_id": video_id,
+            "status": "ok",
+            "post_path": post["post_path"],
+            "replaced": post["replaced"],
+            "seconds": time.monotonic() - started,
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(run_one, vid, url) for vid, url in jobs.items()]
+        for future in as_completed(futures):
+            results.append(future.result())
+    # Once for the whole batch: each update recomputes the similarity matrix.
+    changed = [p for r in results if r["status"] == "ok" for p in (r["post_path"], r["replaced"]) if p]
+    if changed:
+        RELATED_POSTS.update(changed)
+    return results
+
+
+def print_batch_summary(results: list[dict], elapsed: float) -> None:
+    """Print a per-video report followed by totals."""
+    print("\nBatch summary")
+    print("=============")
+    for r in results:
+        status = r["status"].upper()
+        ident = r.get("video_id") or r["url"]
+        if r["status"] == "ok":
+            detail = f"{r['post_path'].relative_to(BLOG_ROOT)} ({r['seconds']:.1f}s)"
+        else:
+            detail = r["error"]
+        print(f"{status:<8} {ident:<14} {detail}")
+
+    counts = {s: sum(1 for r in results if r["status"] == s) for s in ("ok", "failed", "skipped")}
+    print(
+        f"\n{counts['ok']} created, {counts['failed']} failed, "
+        f"{counts['skipped']} skipped in {elapsed:.1f}s"
+    )
+
+
+def main():
+    global STREAM_RESPONSES
+    parser = argparse.ArgumentParser(
+        prog="new-post",
+        description="Create blog posts from YouTube videos.",
+    )
+    parser.add_argument("url", nargs="?", help="YouTube video URL")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help='file of video URLs, one per line ("-" reads stdin)',
+    )
+    parser.add_argument(
+        "--sync",
+        metavar="FILE",
+        help="like --batch, but also regenerate posts whose video has changed",
+    )
+    parser.add_argument(
+        "--playlist",
+        metavar="URL",
+        help="YouTube playlist or channel URL; create posts for its videos that have none yet",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="with --playlist, only list the videos that have no post",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="regenerate posts even if the manifest says they are published",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"videos processed concurrently in batch mode (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="ignore cached video info and captions and fetch them again",
+    )
+    parser.add_argument(
+        "--regenerate",
+        action="store_true",
+        help="ignore memoized Bedrock responses and call the model again",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream Bedrock output, showing each section as it completes",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="only use memoized Bedrock responses; never call the service",
+    )
+    parser.add_argument(
+        "--model",
+        action="append",
+        default=[],
+        metavar="TASK=MODEL[,MODEL...]",
+        help="Bedrock models to try, in order, for a task "
+        f"({', '.join(bedrock_runtime.MODEL_ROUTES)}); repeatable",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="record per-stage spans as JSON lines (default file: under the tools cache) "
+        "and print a summary at the end",
+    )
+    args = parser.parse_args()
+
+    if args.url and is_listing_url(args.url):
+        args.playlist, args.url = args.url, None
+    if sum(bool(x) for x in (args.url, args.batch, args.sync, args.playlist)) != 1:
+        print("Usage: uv run new-post <youtube-url>")
+        print("       uv run new-post --batch <file|-> [--workers N]")
+        print("       uv run new-post --sync <file|-> [--workers N]")
+        print("       uv run new-post --playlist <playlist-or-channel-url> [--dry-run]")
+        sys.exit(1)
+
+    if args.refresh:
+        INFO_CACHE.refresh = True
+        TRANSCRIPT_CACHE.refresh = True
+    if args.regenerate:
+        bedrock_runtime.RESPONSE_CACHE.refresh = True
+    if args.replay:
+        bedrock_runtime.REPLAY_ONLY = True
+    if args.stream:
+        STREAM_RESPONSES = True
+    for spec in args.model:
+        try:
+            bedrock_runtime.set_route(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.trace is not None:
+        tracing.TRACER.start(Path(args.trace) if args.trace else None, tool="new-post")
+
+    if args.playlist:
+        print("Listing videos...")
+        videos = list_videos(args.playlist)
+        known = POST_INDEX.video_ids()
+        unseen = [v for v in videos if args.force or v["id"] not in known]
+        print(f"{len(videos)} videos listed, {len(videos) - len(unseen)} already have posts.")
+        if args.dry_run or not unseen:
+            for v in unseen:
+                print(f"  {v['id']}  {v['title']}")
+            return
+        urls = [VIDEO_URL.format(video_id=v["id"]) for v in unseen]
+    elif args.batch or args.sync:
+        urls = read_urls(args.batch or args.sync)
+
+    if not args.url:
+        print(f"Processing {len(urls)} URLs with {args.workers} workers...")
+        started = time.monotonic()
+        if args.sync and not args.force:
+            results = run_batch(urls, args.workers, process=sync_video, skip_published=False)
+        elif args.force:
+            process = functools.partial(create_post, force=True)
+            results = run_batch(urls, args.workers, process=process, skip_published=False)
+        else:
+            results = run_batch(urls, args.workers)
+        print_batch_summary(results, time.monotonic() - started)
+        if any(r["status"] == "failed" for r in results):
+            sys.exit(1)
+        return
+
+    key = youtube_key(extract_video_id(args.url))
+    if not args.force and MANIFEST.is_published(key):
+        print(f"Already published: {MANIFEST.get(key)['post']} (use --force to regenerate)")
+        return
+
+    post = create_post(args.url, force=args.force)
+    if post.get("skipped"):
+        print(f"\nNot created: {post['skipped']} (use --force to create it anyway)")
+        return
+    RELATED_POSTS.update([p for p in (post["post_path"], post["replaced"]) if p])
+
+    print(f"\nPost created: {post['post_path'].relative_to(BLOG_ROOT)}")
+    print(f"Categories: {post['categories']}")
+    print(f"Tags: {post['tags']}")
+    if post["chapters"]:
+        print(f"Chapters: {len(post['chapters'])}")
+    if post["links"]:
+        print(f"Links: {len(post['links'])}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,258 @@
+"""Cached front-matter index of the posts in _posts/."""
+
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+from disk_cache import CACHE_ROOT
+from sync_manifest import BUILDER_SOURCE_RE, YOUTUBE_EMBED_RE, youtube_key
+
+BLOG_ROOT = Path(__file__).resolve().parent.parent.parent
+POSTS_DIR = BLOG_ROOT / "_posts"
+INDEX_PATH = CACHE_ROOT / "post-index.json"
+
+FILENAME_RE = re.compile(r"(\d{4}-\d{2}-\d{2})-(.+)\.md$")
+FIELD_RE = re.compile(r"([A-Za-z_][\w-]*):\s*(.*)$")
+
+# Words ignored when comparing titles for near-duplicates.
+STOPWORDS = frozenset(
+    "a an and are at by for from how i in is it its of on or the to what with your you".split()
+)
+# Titles whose significant words overlap at least this much (Jaccard index)
+# are near-duplicates.
+NEAR_DUPLICATE_SIMILARITY = 0.8
+
+
+def parse_value(raw: str):
+    """Parse the YAML scalar and flow-sequence values used in post front matter."""
+    raw = raw.strip()
+    if raw.startswith("[") and raw.endswith("]"):
+        return [parse_value(item) for item in raw[1:-1].split(",") if item.strip()]
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "\"'":
+        inner = raw[1:-1]
+        return inner.replace('\\"', '"') if raw[0] == '"' else inner.replace("''", "'")
+    return raw
+
+
+def parse_front_matter(text: str) -> dict:
+    """Parse the front matter block of a post.
+
+    Handles top-level ``key: value`` lines and one level of nesting (such as
+    ``image:`` with indented ``path``/``alt``), which is all the posts use.
+    """
+    if not text.startswith("---"):
+        return {}
+    end = text.find("\n---", 3)
+    if end == -1:
+        return {}
+    data = {}
+    parent = None
+    for line in text[3:end].splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        match = FIELD_RE.match(line.strip())
+        if not match:
+            continue
+        key, value = match.groups()
+        if line[0] in " \t" and parent is not None:
+            data[parent][key] = parse_value(value)
+        elif value.strip():
+            data[key] = parse_value(value)
+            parent = None
+        else:
+            data[key] = {}
+            parent = key
+    return data
+
+
+def title_key(title: str) -> str:
+    """Punctuation- and case-insensitive key for exact title matches.
+
+    The two tools slugify differently ("3.5" becomes "35" or "3-5"), so
+    duplicates are matched on titles reduced to bare letters and digits.
+    """
+    return re.sub(r"[^a-z0-9]+", "", title.lower())
+
+
+def title_words(title: str) -> frozenset[str]:
+    """A title's significant words, for near-duplicate matching."""
+    return frozenset(re.findall(r"[a-z0-9]+", title.lower())) - STOPWORDS
+
+
+def read_post(path: Path) -> dict:
+    """Extract the indexed fields from one post file."""
+    text = path.read_text()
+    meta = parse_front_matter(text)
+    match = FILENAME_RE.match(path.name)
+    source = None
+    embed = YOUTUBE_EMBED_RE.search(text)
+    if embed:
+        source = youtube_key(embed.group(1))
+    else:
+        attribution = BUILDER_SOURCE_RE.search(text)
+        if attribution:
+            source = attribution.group(1)
+    image = meta.get("image")
+    return {
+        "path": str(path.relative_to(BLOG_ROOT)) if path.is_relative_to(BLOG_ROOT) else str(path),
+        "title": meta.get("title", ""),
+        "slug": match.group(2) if match else path.stem,
+        "date": str(meta.get("date") or (match.group(1) if match else "")),
+        "tags": meta.get("tags") or [],
+        "categories": meta.get("categories") or [],
+        "description": meta.get("description", ""),
+        "image": image.get("path") if isinstance(image, dict) else image,
+        "source": source,
+    }
+
+
+class PostIndex:
+    """Front matter of every post, persisted and refreshed by file mtime.
+
+    Loading stats each file in ``_posts`` but re-reads only those whose
+    mtime or size changed since the index was saved. Lookups by source and
+    title are dictionary lookups; near-duplicate titles are found through
+    an index from each significant word to the titles containing it.
+    """
+
+    def __init__(self, posts_dir: Path = POSTS_DIR, index_path: Path = INDEX_PATH):
+        self.posts_dir = posts_dir
+        self.index_path = index_path
+        self._lock = threading.RLock()
+        self._posts = None
+
+    @property
+    def posts(self) -> dict:
+        """Index entries keyed by filename, loaded on first use."""
+        self._ensure_loaded()
+        return self._posts
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._posts is None:
+                self._load()
+
+    def _load(self) -> None:
+        try:
+            cached = json.loads(self.index_path.read_text())["posts"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            cached = {}
+
+        posts = {}
+        changed = False
+        for entry in os.scandir(self.posts_dir):
+            if not entry.name.endswith(".md"):
+                continue
+            st = entry.stat()
+            old = cached.get(entry.name)
+            if old and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+                posts[entry.name] = old
+                continue
+            posts[entry.name] = {
+                **read_post(Path(entry.path)),
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+            }
+            changed = True
+        self._posts = posts
+        # Counted once, from the posts on disk, so that posts added during a
+        # run do not change the vocabulary (and the prompts built from it).
+        self._tag_counts = Counter(tag for post in posts.values() for tag in post["tags"])
+        if changed or posts.keys() != cached.keys():
+            self._save()
+        self._build_lookups()
+
+    def _build_lookups(self) -> None:
+        self._by_source = {}
+        self._by_title = {}
+        self._by_word = {}
+        for post in self._posts.values():
+            self._register(post)
+
+    def _register(self, post: dict) -> None:
+        if post["source"]:
+            self._by_source[post["source"]] = post
+        self._by_title.setdefault(title_key(post["title"]), post)
+        words = title_words(post["title"])
+        for word in words:
+            self._by_word.setdefault(word, []).append((words, post))
+
+    def _save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.index_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"posts": self._posts}, f)
+        os.replace(tmp, self.index_path)
+
+    def add(self, path: Path) -> dict:
+        """Index (or re-index) a single post that was just written."""
+        with self._lock:
+            self._ensure_loaded()
+            st = path.stat()
+            post = {**read_post(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+            self._posts[path.name] = post
+            self._register(post)
+            self._save()
+            return post
+
+    def remove(self, path: Path) -> None:
+        """Drop a post that was deleted or superseded by a renamed one."""
+        with self._lock:
+            self._ensure_loaded()
+            if self._posts.pop(path.name, None) is not None:
+                self._build_lookups()
+                self._save()
+
+    def by_source(self, source: str) -> dict | None:
+        self._ensure_loaded()
+        return self._by_source.get(source)
+
+    def find_duplicate(self, title: str, source: str | None = None) -> dict | None:
+        """Return an existing post for the same source, title, or near-identical title."""
+        self._ensure_loaded()
+        if source and source in self._by_source:
+            return self._by_source[source]
+        return self._by_title.get(title_key(title)) or self._find_near(title)
+
+    def _find_near(self, title: str) -> dict | None:
+        """The post whose title shares the most significant words, if similar enough.
+
+        A title made only of stopwords has nothing to compare, so it never
+        matches.
+        """
+        words = title_words(title)
+        best, best_score = None, NEAR_DUPLICATE_SIMILARITY
+        for word in sorted(words):
+            for other, post in self._by_word.get(word, ()):
+                score = len(words & other) / len(words | other)
+                if score >= best_score and (best is None or score > best_score):
+                    best, best_score = post, score
+        return best
+
+    def tag_vocabulary(self, limit: int = 40, exclude: tuple[str, ...] = ("video",)) -> list[str]:
+        """Tags in use when the index was loaded, most common first, then by name."""
+        self._ensure_loaded()
+        ranked = sorted(
+            ((count, tag) for tag, count in self._tag_counts.items() if tag not in exclude),
+            key=lambda item: (-item[0], item[1]),
+        )
+        return [tag for _, tag in ranked[:limit]]
+
+    def video_ids(self) -> set[str]:
+        """IDs of YouTube videos that already have a post."""
+        prefix = youtube_key("")
+        with self._lock:
+            self._ensure_loaded()
+            posts = list(self._posts.values())
+        return {
+            post["source"][len(prefix) :]
+            for post in posts
+            if post["source"] and post["source"].startswith(prefix)
+        }
+
+
+POST_INDEX = PostIndex()
@@ -0,0 +1,135 @@
+"""Adaptive client-side rate limiting with retry and backoff.
+
+Each remote service gets one limiter shared by every worker thread in the
+process. The limiter is a token bucket whose rate adapts to the service:
+throttling cuts it by 30%, and each success raises it a little, so a bulk run
+settles just under the highest rate the service will sustain. Calls that
+are throttled or fail transiently are retried with jittered exponential
+backoff, never sooner than the server's Retry-After.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+import tracing
+
+MAX_ATTEMPTS = 6
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+
+
+class AdaptiveRateLimiter:
+    """Token bucket shared across threads, adjusted by additive increase and
+    multiplicative decrease.
+
+    ``rate`` is requests per second. It is never set below ``min_rate`` or
+    above ``max_rate``, and up to ``burst`` requests may go out at once
+    after a quiet spell.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        min_rate: float = 0.1,
+        max_rate: float = 50.0,
+        burst: float = 1.0,
+        increase: float = 0.05,
+        decrease: float = 0.7,
+    ):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the caller may send one request.
+
+        Each caller reserves a token up front, so waiting callers are
+        served in order rather than racing for the next one.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = max(self._paused_until - now, -self._tokens / self.rate)
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        """Slow down, and if the server said when to retry, hold everyone until then."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int, base: float = BASE_DELAY, cap: float = MAX_DELAY) -> float:
+    """Full-jitter exponential backoff for the given (zero-based) retry."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def call(
+    limiter: AdaptiveRateLimiter,
+    func: Callable,
+    classify: Callable[[Exception], tuple[str | None, float | None]],
+    max_attempts: int = MAX_ATTEMPTS,
+):
+    """Call ``func()`` under ``limiter``, retrying throttled and transient failures.
+
+    ``classify(exc)`` returns ``(kind, retry_after)``: kind is "throttle",
+    "retry" (transient, but not a sign of sending too fast) or None for
+    errors that must not be retried. The last error is re-raised once
+    ``max_attempts`` calls have failed.
+    """
+    for attempt in range(max_attempts):
+        limiter.acquire()
+        try:
+            result = func()
+        except Exception as e:
+            kind, retry_after = classify(e)
+            if kind is None or attempt + 1 == max_attempts:
+                raise
+            if kind == "throttle":
+                limiter.on_throttle(retry_after)
+                tracing.add("throttles")
+            tracing.add("retries")
+            time.sleep(max(retry_after or 0.0, backoff(attempt)))
+            continue
+        limiter.on_success()
+        return result
+
+
+# Shared by every caller in the process. The starting rate is modest and
+# climbs towards what the service actually allows. (Bedrock quotas are per
+# model, so bedrock_runtime keeps one limiter per model.)
+TAVILY = AdaptiveRateLimiter("tavily", rate=1.0, max_rate=10.0, burst=2.0)
@@ -0,0 +1,232 @@
+"""Precompute each post's most similar posts for the "Further Reading" block.
+
+Posts are vectorized with TF-IDF over their title, tags, description and
+body (which, for video posts, is the generated summary), and each post's
+TOP_K nearest neighbours by cosine similarity are written to
+``_data/related.json``, keyed by post path, for
+``_includes/related-posts.html``.
+
+Term counts are kept per post in tools/related-posts.json, so only new or
+changed posts are read again. When a few posts change, only their rows of
+the similarity matrix are computed, plus the rows of posts whose
+neighbours they were; the rest keep their lists (scored against the IDF
+weights of when they were last computed). ``--rebuild`` recomputes every
+row. The TF-IDF matrix is sparse (SciPy), so memory grows with the terms
+posts actually use rather than posts x vocabulary; NumPy and SciPy are
+imported on first use. The tools call ``update`` once per batch, not once
+per post.
+
+    python tools/new-post/related_posts.py [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+from post_index import read_post
+from search_index import FRONT_MATTER_RE, MARKUP_RE, post_url, terms
+
+BLOG_ROOT = Path(__file__).resolve().parent.parent.parent
+POSTS_DIR = BLOG_ROOT / "_posts"
+DATA_PATH = BLOG_ROOT / "_data" / "related.json"
+STATE_PATH = BLOG_ROOT / "tools" / "related-posts.json"
+
+TOP_K = 3
+# Each occurrence in these fields counts this many times a body occurrence.
+FIELD_WEIGHTS = {"title": 3, "tags": 3, "description": 2, "body": 1}
+# Rows of the similarity matrix computed per matrix product.
+BATCH_ROWS = 256
+# Beyond this many changed posts, every row is recomputed anyway.
+INCREMENTAL_LIMIT = 16
+
+
+def term_counts(path: Path) -> tuple[dict, dict]:
+    """Weighted term counts of a post, and the fields the layout shows."""
+    text = path.read_text()
+    post = read_post(path)
+    counts = Counter()
+    fields = {
+        "title": post["title"],
+        "tags": " ".join(post["tags"]),
+        "description": post["description"],
+        "body": MARKUP_RE.sub(" ", FRONT_MATTER_RE.sub("", text)),
+    }
+    for field, value in fields.items():
+        for term in terms(value):
+            counts[term] += FIELD_WEIGHTS[field]
+    meta = {
+        "url": post_url(path),
+        "title": post["title"],
+        "date": post["date"],
+        "description": post["description"],
+    }
+    return dict(counts), meta
+
+
+def tfidf_matrix(counts: list[dict]):
+    """Sparse L2-normalized TF-IDF rows (sublinear term frequency, smoothed IDF)."""
+    import numpy as np
+    from scipy import sparse
+
+    vocab = {}
+    indices = []
+    data = []
+    indptr = [0]
+    for c in counts:
+        for term, n in c.items():
+            indices.append(vocab.setdefault(term, len(vocab)))
+            data.append(1 + math.log(n))
+        indptr.append(len(indices))
+    indices = np.array(indices, dtype=np.int32)
+    data = np.array(data, dtype=np.float32)
+    df = np.bincount(indices, minlength=len(vocab))
+    data *= (np.log((1 + len(counts)) / (1 + df)) + 1).astype(np.float32)[indices]
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(counts), len(vocab)))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms, dtype=np.float32) @ matrix)
+
+
+def nearest(matrix, rows: list[int], k: int = TOP_K) -> dict[int, list[tuple[int, float]]]:
+    """Top-k cosine neighbours (excluding itself) of each given row."""
+    import numpy as np
+
+    result = {}
+    k = min(k, matrix.shape[0] - 1)
+    if k <= 0:
+        return {row: [] for row in rows}
+    for start in range(0, len(rows), BATCH_ROWS):
+        batch = rows[start : start + BATCH_ROWS]
+        scores = (matrix[batch] @ matrix.T).toarray()
+        scores[np.arange(len(batch)), batch] = -1
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for i, row in enumerate(batch):
+            order = top[i][np.argsort(-scores[i, top[i]])]
+            result[row] = [(int(j), float(scores[i, j])) for j in order]
+    return result
+
+
+def write_json(path: Path, data, **kwargs) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, ensure_ascii=False, sort_keys=True, **kwargs)
+    os.replace(tmp, path)
+
+
+class RelatedPosts:
+    """Per-post term counts and neighbour lists, updated as posts are added."""
+
+    def __init__(self, state_path: Path = STATE_PATH, data_path: Path = DATA_PATH):
+        self.state_path = state_path
+        self.data_path = data_path
+        self._lock = threading.Lock()
+        self._state = None
+
+    def _load(self) -> None:
+        if self._state is None:
+            if self.state_path.exists() and self.data_path.exists():
+                self._state = json.loads(self.state_path.read_text())
+            else:
+                self._state = {"posts": {}, "neighbours": {}}
+
+    def update(self, paths: list[Path], rebuild: bool = False) -> int:
+        """Recompute neighbours after the given posts changed; returns how many did."""
+        with self._lock:
+            self._load()
+            posts = self._state["posts"]
+            neighbours = self._state["neighbours"]
+            changed = set()
+            for path in paths:
+                path = path.resolve()
+                rel = str(path.relative_to(BLOG_ROOT)) if path.is_relative_to(BLOG_ROOT) else str(path)
+                if not path.exists():
+                    if posts.pop(rel, None) is not None:
+                        changed.add(rel)
+                    continue
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                if rel in posts and posts[rel]["hash"] == digest and not rebuild:
+                    continue
+                counts, meta = term_counts(path)
+                posts[rel] = {"hash": digest, "counts": counts, "meta": meta}
+                changed.add(rel)
+            if not changed and not rebuild:
+                return 0
+
+            names = sorted(posts)
+            if rebuild or len(changed) > INCREMENTAL_LIMIT or not neighbours:
+                stale = set(names)
+            else:
+                # The changed posts, and every post that listed one of them.
+                stale = {
+                    n for n in names
+                    if n in changed
+                    or n not in neighbours
+                    or any(other in changed for other, _ in neighbours[n])
+                }
+
+            matrix = tfidf_matrix([posts[n]["counts"] for n in names])
+            index = {n: i for i, n in enumerate(names)}
+            fresh = nearest(matrix, sorted(index[n] for n in stale))
+            for n in list(neighbours):
+                if n not in posts:
+                    del neighbours[n]
+            for row, found in fresh.items():
+                neighbours[names[row]] = [[names[j], round(score, 4)] for j, score in found]
+
+            # Untouched posts may now count a new or changed post among their nearest.
+            added = [index[n] for n in changed if n in index]
+            if added and len(stale) < len(names):
+                scores = (matrix[added] @ matrix.T).toarray()
+                for n in names:
+                    if n in stale:
+                        continue
+                    candidates = neighbours[n] + [
+                        [names[row], round(float(scores[i, index[n]]), 4)]
+                        for i, row in enumerate(added)
+                    ]
+                    neighbours[n] = sorted(candidates, key=lambda c: -c[1])[:TOP_K]
+
+            self._save()
+            return len(changed)
+
+    def refresh(self, rebuild: bool = False) -> int:
+        """Bring the neighbours in line with every post in POSTS_DIR."""
+        with self._lock:
+            self._load()
+            gone = [BLOG_ROOT / rel for rel in self._state["posts"] if not (BLOG_ROOT / rel).exists()]
+        return self.update(sorted(POSTS_DIR.glob("*.md")) + gone, rebuild)
+
+    def _save(self) -> None:
+        posts = self._state["posts"]
+        related = {
+            rel: [posts[other]["meta"] for other, _ in found]
+            for rel, found in self._state["neighbours"].items()
+        }
+        write_json(self.data_path, related, indent=1)
+        write_json(self.state_path, self._state, separators=(",", ":"))
+
+
+RELATED_POSTS = RelatedPosts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute related posts by TF-IDF similarity.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every post's neighbours")
+    args = parser.parse_args()
+
+    changed = RELATED_POSTS.refresh(rebuild=args.rebuild)
+    if changed:
+        print(f"{changed} posts changed; updated {DATA_PATH.relative_to(BLOG_ROOT)}.")
+    else:
+        print(f"{DATA_PATH.relative_to(BLOG_ROOT)} is up to date.")
+
+
+if __name__ == "__main__":
+    main()
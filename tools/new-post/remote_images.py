@@ -0,0 +1,196 @@
+"""Download the remote images a post links to and point it at local copies.
+
+Images go to ``assets/images/<slug>/``, fetched concurrently. Each is
+identified by the SHA-256 of its bytes, so an image that several posts use
+(or that a CDN serves under several URLs) is stored once and shared.
+An index of every URL fetched and every hash stored is saved after each
+download, so an interrupted run picks up where it stopped; URLs that fail
+keep their remote link and are tried again next time.
+
+    uv run localize-images [POST ...]   # default: every post in _posts/
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import http_pool
+import tracing
+from sync_manifest import MANIFEST, file_hash
+
+BLOG_ROOT = Path(__file__).resolve().parent.parent.parent
+POSTS_DIR = BLOG_ROOT / "_posts"
+IMAGES_DIR = BLOG_ROOT / "assets" / "images"
+INDEX_PATH = BLOG_ROOT / "tools" / "remote-images.json"
+
+DOWNLOAD_WORKERS = 8
+
+# Markdown images with an absolute http(s) URL; group 2 is the URL.
+REMOTE_IMAGE_RE = re.compile(r"(!\[[^\]]*\]\()(https?://[^)\s]+)(\))")
+POST_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}-")
+UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def post_slug(post_path: Path) -> str:
+    return POST_DATE_RE.sub("", post_path.stem)
+
+
+def file_name(url: str, digest: str) -> str:
+    """A readable file name from the URL, made unique with the content hash."""
+    name = UNSAFE_NAME_RE.sub("-", unquote(Path(urlparse(url).path).name)).strip("-.")
+    stem, suffix = os.path.splitext(name or "image")
+    return f"{stem[:60] or 'image'}-{digest[:8]}{suffix.lower()}"
+
+
+class ImageIndex:
+    """URLs already localized and the file holding each distinct image.
+
+    ``urls`` maps a remote URL to the SHA-256 of its content; ``files``
+    maps that hash to the image's path under the blog root.
+    """
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = None
+
+    @property
+    def data(self) -> dict:
+        with self._lock:
+            if self._data is None:
+                if self.path.exists():
+                    self._data = json.loads(self.path.read_text())
+                else:
+                    self._data = {"urls": {}, "files": {}}
+            return self._data
+
+    def lookup(self, url: str) -> str | None:
+        """The local site path for ``url``, if it was fetched and the file is still there."""
+        data = self.data
+        digest = data["urls"].get(url)
+        stored = data["files"].get(digest) if digest else None
+        if stored and (BLOG_ROOT / stored).exists():
+            return "/" + stored
+        return None
+
+    def add(self, url: str, tmp: Path, dest_dir: Path) -> str:
+        """Adopt a downloaded file, or discard it if its content is already stored."""
+        digest = file_hash(tmp)
+        data = self.data
+        with self._lock:
+            stored = data["files"].get(digest)
+            if stored and (BLOG_ROOT / stored).exists():
+                tmp.unlink()
+            else:
+                dest = dest_dir / file_name(url, digest)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp, dest)
+                stored = str(dest.relative_to(BLOG_ROOT))
+                data["files"][digest] = stored
+            data["urls"][url] = digest
+            self._save()
+        return "/" + stored
+
+    def _save(self) -> None:
+        text = json.dumps(self._data, indent=2, sort_keys=True) + "\n"
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+
+
+INDEX = ImageIndex()
+
+
+def fetch(url: str, dest_dir: Path) -> str | None:
+    """Download one image and return its local site path, or None on failure."""
+    found = INDEX.lookup(url)
+    if found:
+        return found
+    staging = dest_dir / f".{hashlib.sha256(url.encode()).hexdigest()[:16]}.download"
+    # Left over from an interrupted run; it would only be revalidated, not fetched.
+    staging.unlink(missing_ok=True)
+    import requests  # loaded by http_pool already; deferred to keep imports fast
+
+    try:
+        status = http_pool.download(url, staging)
+    except (requests.RequestException, OSError) as e:
+        print(f"  Image not downloaded, keeping remote link: {url} ({type(e).__name__}: {e})")
+        return None
+    if status != "downloaded":
+        print(f"  Image not downloaded, keeping remote link: {url} (no usable response)")
+        return None
+    return INDEX.add(url, staging, dest_dir)
+
+
+@tracing.traced("images")
+def localize(markdown: str, slug: str, workers: int = DOWNLOAD_WORKERS) -> tuple[str, dict]:
+    """Download the remote images in ``markdown`` and link to the local copies.
+
+    Returns the rewritten markdown and counts of images ``localized`` and
+    ``failed`` (left pointing at their remote URL).
+    """
+    urls = list(dict.fromkeys(m.group(2) for m in REMOTE_IMAGE_RE.finditer(markdown)))
+    if not urls:
+        return markdown, {"localized": 0, "failed": 0}
+    dest_dir = IMAGES_DIR / slug
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+        local = dict(zip(urls, pool.map(lambda url: fetch(url, dest_dir), urls)))
+    # Staging files were made here even if every image turned out to be shared.
+    with contextlib.suppress(OSError):
+        dest_dir.rmdir()
+
+    def replace(match: re.Match) -> str:
+        path = local.get(match.group(2))
+        return f"{match.group(1)}{path}{match.group(3)}" if path else match.group(0)
+
+    failed = sum(path is None for path in local.values())
+    tracing.annotate(images=len(urls), failed=failed)
+    return REMOTE_IMAGE_RE.sub(replace, markdown), {"localized": len(urls) - failed, "failed": failed}
+
+
+def localize_post(post_path: Path, workers: int = DOWNLOAD_WORKERS) -> dict:
+    """Localize a post's images in place, keeping the sync manifest in step."""
+    text = post_path.read_text()
+    rewritten, counts = localize(text, post_slug(post_path), workers)
+    if rewritten != text:
+        previous = file_hash(post_path)
+        post_path.write_text(rewritten)
+        MANIFEST.post_rewritten(post_path, previous)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Download remote images linked from posts and link to local copies."
+    )
+    parser.add_argument("posts", nargs="*", type=Path, help="posts to process (default: all)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DOWNLOAD_WORKERS,
+        help=f"concurrent downloads per post (default: {DOWNLOAD_WORKERS})",
+    )
+    args = parser.parse_args()
+
+    posts = args.posts or sorted(POSTS_DIR.glob("*.md"))
+    totals = {"localized": 0, "failed": 0}
+    for post in posts:
+        counts = localize_post(post, args.workers)
+        if counts["localized"] or counts["failed"]:
+            print(f"{post.name}: {counts['localized']} localized, {counts['failed']} failed")
+        for key in totals:
+            totals[key] += counts[key]
+    print(f"\n{totals['localized']} images localized, {totals['failed']} failed.")
+
+
+if __name__ == "__main__":
+    main()
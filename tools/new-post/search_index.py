@@ -0,0 +1,235 @@
+"""Sharded inverted index of the posts, for the site's search box.
+
+Terms from each post's title, tags, categories, description and body are
+weighted by field and written to ``assets/js/data/search/``:
+
+    docs.json   every post's URL, title, categories, tags and description,
+                a content hash for each shard (used to bust caches) and
+                the stopwords left out of the index
+    <ab>.json   term -> [[post id, weight], ...] for terms starting "ab"
+    _.json      terms that do not start with two ASCII letters or digits
+
+``_includes/search-loader.html`` fetches docs.json and then only the
+shards for the words typed, rather than the whole blog. Posts are
+reindexed only when their content hash changes, and only the shards they
+touch are rewritten; tools/search-index.json keeps each post's id, hash
+and shards between runs.
+
+    python tools/new-post/search_index.py [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+from post_index import FILENAME_RE, read_post
+
+BLOG_ROOT = Path(__file__).resolve().parent.parent.parent
+POSTS_DIR = BLOG_ROOT / "_posts"
+INDEX_DIR = BLOG_ROOT / "assets" / "js" / "data" / "search"
+STATE_PATH = BLOG_ROOT / "tools" / "search-index.json"
+
+PREFIX_LENGTH = 2
+MISC_SHARD = "_"
+FIELD_WEIGHTS = {"title": 10, "tags": 6, "categories": 4, "description": 3, "body": 1}
+# Body occurrences beyond this add nothing, so long posts don't drown out titles.
+BODY_COUNT_CAP = 5
+
+TERM_RE = re.compile(r"[^\W_]+")
+SHARD_KEY_RE = re.compile(r"[a-z0-9]{2}")
+FRONT_MATTER_RE = re.compile(r"\A---\n.*?\n---\n", re.DOTALL)
+# Liquid tags, HTML tags and link targets carry no words worth searching.
+MARKUP_RE = re.compile(r"\{%.*?%\}|\{\{.*?\}\}|<[^>]+>|\]\([^)]*\)|https?://\S+", re.DOTALL)
+STOPWORDS = frozenset(
+    """a an and are as at be but by can do for from has have how i if in into is it its
+    of on or so that the their then there these this to was we what when which will with
+    you your""".split()
+)
+
+
+def terms(text: str) -> list[str]:
+    """Lowercase words of two or more characters, stopwords removed."""
+    return [t for t in TERM_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def shard_key(term: str) -> str:
+    prefix = term[:PREFIX_LENGTH]
+    return prefix if SHARD_KEY_RE.fullmatch(prefix) else MISC_SHARD
+
+
+def post_url(path: Path) -> str:
+    """The post's URL under the site's /posts/:title/ permalink."""
+    match = FILENAME_RE.match(path.name)
+    return f"/posts/{match.group(2) if match else path.stem}/"
+
+
+def weigh_terms(post: dict, text: str) -> dict[str, int]:
+    """Each term's weight in a post: the field weights of everywhere it appears."""
+    fields = {
+        "title": post["title"],
+        "tags": " ".join(post["tags"]),
+        "categories": " ".join(post["categories"]),
+        "description": post["description"],
+    }
+    weights = Counter()
+    for field, value in fields.items():
+        for term in set(terms(value)):
+            weights[term] += FIELD_WEIGHTS[field]
+    body = MARKUP_RE.sub(" ", FRONT_MATTER_RE.sub("", text))
+    for term, count in Counter(terms(body)).items():
+        weights[term] += FIELD_WEIGHTS["body"] * min(count, BODY_COUNT_CAP)
+    return dict(weights)
+
+
+def write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp, path)
+
+
+class SearchIndex:
+    """The published index plus the per-post state needed to update it in place.
+
+    State and shards are loaded on first use and kept in memory, so a
+    batch run that adds many posts reads each shard at most once.
+    """
+
+    def __init__(self, index_dir: Path = INDEX_DIR, state_path: Path = STATE_PATH):
+        self.index_dir = index_dir
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._state = None
+        self._docs = None
+        self._shards = {}
+
+    def _load(self) -> None:
+        if self._state is not None:
+            return
+        self._state = {"next_id": 1, "posts": {}}
+        self._docs = {"posts": {}, "shards": {}}
+        docs_path = self.index_dir / "docs.json"
+        if self.state_path.exists() and docs_path.exists():
+            self._state = json.loads(self.state_path.read_text())
+            self._docs = json.loads(docs_path.read_text())
+
+    def _shard(self, key: str) -> dict:
+        if key not in self._shards:
+            path = self.index_dir / f"{key}.json"
+            self._shards[key] = json.loads(path.read_text()) if path.exists() else {}
+        return self._shards[key]
+
+    def _remove(self, rel: str, dirty: set[str]) -> int | None:
+        """Drop a post's postings; returns its id."""
+        entry = self._state["posts"].pop(rel, None)
+        if entry is None:
+            return None
+        doc_id = entry["id"]
+        for key in entry["shards"]:
+            shard = self._shard(key)
+            for term in [t for t, postings in shard.items() if any(p[0] == doc_id for p in postings)]:
+                shard[term] = [p for p in shard[term] if p[0] != doc_id]
+                if not shard[term]:
+                    del shard[term]
+            dirty.add(key)
+        self._docs["posts"].pop(str(doc_id), None)
+        return doc_id
+
+    def _add(self, path: Path, rel: str, digest: str, doc_id: int | None, dirty: set[str]) -> None:
+        text = path.read_text()
+        post = read_post(path)
+        if doc_id is None:
+            doc_id = self._state["next_id"]
+            self._state["next_id"] += 1
+        keys = set()
+        for term, weight in weigh_terms(post, text).items():
+            key = shard_key(term)
+            self._shard(key).setdefault(term, []).append([doc_id, weight])
+            keys.add(key)
+        dirty |= keys
+        self._state["posts"][rel] = {"id": doc_id, "hash": digest, "shards": sorted(keys)}
+        self._docs["posts"][str(doc_id)] = {
+            "url": post_url(path),
+            "title": post["title"],
+            "date": post["date"],
+            "categories": post["categories"],
+            "tags": post["tags"],
+            "description": post["description"],
+        }
+
+    def update(self, paths: list[Path], force: bool = False) -> int:
+        """Reindex the given posts (dropping any that no longer exist); returns how many changed."""
+        with self._lock:
+            self._load()
+            dirty = set()
+            changed = 0
+            for path in paths:
+                path = path.resolve()
+                rel = str(path.relative_to(BLOG_ROOT)) if path.is_relative_to(BLOG_ROOT) else str(path)
+                entry = self._state["posts"].get(rel)
+                if not path.exists():
+                    changed += self._remove(rel, dirty) is not None
+                    continue
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                if entry and entry["hash"] == digest and not force:
+                    continue
+                doc_id = self._remove(rel, dirty)
+                self._add(path, rel, digest, doc_id, dirty)
+                changed += 1
+            if dirty or changed:
+                self._save(dirty)
+            return changed
+
+    def refresh(self, force: bool = False) -> int:
+        """Bring the index in line with every post in POSTS_DIR."""
+        with self._lock:
+            self._load()
+        current = sorted(POSTS_DIR.glob("*.md"))
+        gone = [BLOG_ROOT / rel for rel in self._state["posts"] if not (BLOG_ROOT / rel).exists()]
+        return self.update(current + gone, force)
+
+    def counts(self) -> tuple[int, int]:
+        """Posts indexed and shards written."""
+        with self._lock:
+            self._load()
+            return len(self._docs["posts"]), len(self._docs["shards"])
+
+    def _save(self, dirty: set[str]) -> None:
+        for key in sorted(dirty):
+            shard = self._shard(key)
+            path = self.index_dir / f"{key}.json"
+            if not shard:
+                path.unlink(missing_ok=True)
+                self._docs["shards"].pop(key, None)
+                continue
+            for postings in shard.values():
+                postings.sort(key=lambda p: (-p[1], p[0]))
+            write_json(path, shard)
+            self._docs["shards"][key] = hashlib.sha256(path.read_bytes()).hexdigest()[:10]
+        self._docs["stopwords"] = sorted(STOPWORDS)
+        write_json(self.index_dir / "docs.json", self._docs)
+        self.state_path.write_text(json.dumps(self._state, indent=1, sort_keys=True) + "\n")
+
+
+SEARCH_INDEX = SearchIndex()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update the sharded search index of the posts.")
+    parser.add_argument("--rebuild", action="store_true", help="reindex every post, changed or not")
+    args = parser.parse_args()
+
+    changed = SEARCH_INDEX.refresh(force=args.rebuild)
+    posts, shards = SEARCH_INDEX.counts()
+    print(f"Reindexed {changed} posts; {posts} posts in {shards} shards.")
+
+
+if __name__ == "__main__":
+    main()
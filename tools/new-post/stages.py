@@ -0,0 +1,66 @@
+"""Run the stages of a pipeline as soon as their inputs are ready."""
+
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+# name -> (function, names of the stages whose results it takes)
+StageGraph = dict[str, tuple[Callable, tuple[str, ...]]]
+
+
+def check_graph(stages: StageGraph) -> None:
+    """Raise ValueError for unknown dependencies or cycles."""
+    for name, (_, deps) in stages.items():
+        unknown = [d for d in deps if d not in stages]
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on unknown stage(s): {', '.join(unknown)}")
+    resolved = set()
+    remaining = dict(stages)
+    while remaining:
+        ready = [n for n, (_, deps) in remaining.items() if resolved.issuperset(deps)]
+        if not ready:
+            raise ValueError(f"Dependency cycle among stages: {', '.join(remaining)}")
+        for name in ready:
+            resolved.add(name)
+            del remaining[name]
+
+
+def run_stages(stages: StageGraph) -> dict:
+    """Run every stage, each in its own thread once its dependencies finish.
+
+    A stage is called with its dependencies' results as keyword arguments,
+    and the results of all stages are returned by name. Stages run in the
+    caller's context (so tracing spans nest under the caller's). If a stage
+    raises, stages not yet started are dropped, running ones are waited
+    for, and the first error is re-raised.
+    """
+    check_graph(stages)
+    results = {}
+    pending = dict(stages)
+    running = {}
+    error = None
+
+    with ThreadPoolExecutor(max_workers=len(stages) or 1) as pool:
+        while pending or running:
+            if error is None:
+                for name, (func, deps) in list(pending.items()):
+                    if all(d in results for d in deps):
+                        kwargs = {d: results[d] for d in deps}
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, func, **kwargs)] = name
+                        del pending[name]
+            else:
+                pending.clear()
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    error = error or e
+
+    if error is not None:
+        raise error
+    return results
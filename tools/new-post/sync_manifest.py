@@ -0,0 +1,169 @@
+"""Persistent record of which sources have already been turned into posts."""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+BLOG_ROOT = Path(__file__).resolve().parent.parent.parent
+POSTS_DIR = BLOG_ROOT / "_posts"
+MANIFEST_PATH = BLOG_ROOT / "tools" / "sync-manifest.json"
+
+YOUTUBE_EMBED_RE = re.compile(r"\{%\s*include embed/youtube\.html id='([^']+)'")
+BUILDER_SOURCE_RE = re.compile(r"originally published on the \[AWS Builder Center\]\((\S+?)\)")
+
+
+def youtube_key(video_id: str) -> str:
+    return f"youtube:{video_id}"
+
+
+def fingerprint(*parts) -> str:
+    """Hash the parts of a source that, when changed, warrant a new post."""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode()).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def relative_path(path: Path) -> str:
+    """Path relative to the blog root, or absolute if it lies outside it."""
+    path = path.resolve()
+    return str(path.relative_to(BLOG_ROOT)) if path.is_relative_to(BLOG_ROOT) else str(path)
+
+
+class SyncManifest:
+    """Maps source keys to the post generated from them.
+
+    Keys are ``youtube:<video id>`` or a Builder Center URL. Each entry
+    holds the post path (relative to the blog root), the SHA-256 of the
+    post as written, and a fingerprint of the source it was built from.
+    The manifest is seeded from existing posts the first time it is loaded,
+    and saved after every change so interrupted runs lose nothing. The file
+    is committed alongside the posts: a fresh clone that seeded its own
+    would not know which posts the tools generated.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+
+    @property
+    def entries(self) -> dict:
+        with self._lock:
+            if self._entries is None:
+                if self.path.exists():
+                    self._entries = json.loads(self.path.read_text())["sources"]
+                else:
+                    self._entries = {}
+                    self._seed_from_posts()
+                    self._save()
+            return self._entries
+
+    def get(self, key: str) -> dict | None:
+        return self.entries.get(key)
+
+    def is_published(self, key: str) -> bool:
+        """True if the source has a post that still exists on disk."""
+        entry = self.get(key)
+        return bool(entry) and (BLOG_ROOT / entry["post"]).exists()
+
+    def status(self, key: str, source_fingerprint: str) -> str:
+        """Classify a source against the manifest.
+
+        Returns "new" (never published or post deleted), "unchanged",
+        "changed" (source differs and the post is as generated), "edited"
+        (the post was changed by hand since, so it must not be overwritten)
+        or "adopted" (seeded from an existing post; fingerprint recorded now).
+        """
+        entry = self.get(key)
+        if not entry or not (BLOG_ROOT / entry["post"]).exists():
+            return "new"
+        if entry["source_fingerprint"] is None:
+            with self._lock:
+                entry["source_fingerprint"] = source_fingerprint
+                self._save()
+            return "adopted"
+        if entry["source_fingerprint"] == source_fingerprint:
+            return "unchanged"
+        if file_hash(BLOG_ROOT / entry["post"]) != entry["content_hash"]:
+            return "edited"
+        return "changed"
+
+    def record(self, key: str, post_path: Path, source_fingerprint: str | None) -> Path | None:
+        """Record that ``post_path`` was just written from the given source.
+
+        Returns the post previously generated from the source if it is a
+        different file that still exists (the title or date changed), so the
+        caller can remove it rather than publish the source twice.
+        """
+        entries = self.entries
+        with self._lock:
+            old = entries.get(key)
+            previous = BLOG_ROOT / old["post"] if old else None
+            entries[key] = {
+                "post": relative_path(post_path),
+                "content_hash": file_hash(post_path),
+                "source_fingerprint": source_fingerprint,
+                "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            self._save()
+        if previous and previous.resolve() != post_path.resolve() and previous.exists():
+            return previous
+        return None
+
+    def post_rewritten(self, post_path: Path, previous_hash: str) -> None:
+        """Accept a tool's rewrite of a post, unless the post had been edited by hand.
+
+        Entries whose recorded hash matched the post before the rewrite are
+        updated, so later syncs do not mistake the rewrite for a hand edit.
+        """
+        post = relative_path(post_path)
+        entries = self.entries
+        with self._lock:
+            matched = [
+                e for e in entries.values()
+                if e["post"] == post and e["content_hash"] == previous_hash
+            ]
+            for entry in matched:
+                entry["content_hash"] = file_hash(post_path)
+            if matched:
+                self._save()
+
+    def _seed_from_posts(self) -> None:
+        """Register sources of posts that predate the manifest."""
+        for post in sorted(POSTS_DIR.glob("*.md")):
+            raw = post.read_bytes()
+            text = raw.decode()
+            match = YOUTUBE_EMBED_RE.search(text)
+            if match:
+                key = youtube_key(match.group(1))
+            else:
+                match = BUILDER_SOURCE_RE.search(text)
+                if not match:
+                    continue
+                key = match.group(1)
+            self._entries.setdefault(
+                key,
+                {
+                    "post": str(post.relative_to(BLOG_ROOT)),
+                    "content_hash": hashlib.sha256(raw).hexdigest(),
+                    "source_fingerprint": None,
+                    "updated": None,
+                },
+            )
+
+    def _save(self) -> None:
+        data = json.dumps({"sources": self._entries}, indent=2, sort_keys=True) + "\n"
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+MANIFEST = SyncManifest()
@@ -0,0 +1,219 @@
+"""Per-stage spans with timing, transfer and token counters.
+
+Wrap each pipeline stage in ``with span("stage"):``. Code deeper down
+(HTTP downloads, Bedrock calls) adds to the innermost open span with
+``add("bytes", n)`` without having to be handed the span. Spans nest per
+thread and asyncio task, and a thread started with ``asyncio.to_thread``
+inherits the caller's span.
+
+Nothing is written unless a trace file has been opened with
+``TRACER.start()``; each finished span then becomes one JSON line, and a
+table totalling them by stage is printed when the process exits.
+"""
+
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from disk_cache import CACHE_ROOT
+
+TRACE_DIR = CACHE_ROOT / "traces"
+
+# Counters shown in the summary table, in column order.
+SUMMARY_COUNTERS = (
+    "bytes",
+    "retries",
+    "throttles",
+    "input_tokens",
+    "output_tokens",
+    "cache_hits",
+)
+
+_current = contextvars.ContextVar("tracing_span", default=None)
+_ids = itertools.count(1)
+
+
+class Span:
+    """One timed stage. ``attrs`` describe it; ``counters`` accumulate.
+
+    Stages run concurrently in threads that share a parent span, so
+    updates take the span's lock.
+    """
+
+    __slots__ = ("id", "parent", "name", "attrs", "counters", "started", "duration", "error", "_lock")
+
+    def __init__(self, name: str, parent: "Span | None", attrs: dict):
+        self.id = next(_ids)
+        self.parent = parent.id if parent else None
+        self.name = name
+        self.attrs = attrs
+        self.counters = {}
+        self.started = time.time()
+        self.duration = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def set(self, **attrs) -> None:
+        with self._lock:
+            self.attrs.update(attrs)
+
+    def to_record(self, trace_id: str) -> dict:
+        return {
+            "trace": trace_id,
+            "span": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "start": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "seconds": round(self.duration, 6),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attrs": dict(self.attrs),
+            "counters": dict(self.counters),
+        }
+
+
+class Tracer:
+    """Writes finished spans to a JSON-lines file and keeps them for the summary."""
+
+    def __init__(self):
+        self.path = None
+        self.trace_id = None
+        self.records = []
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def start(self, path: Path | None = None, tool: str = "trace") -> Path:
+        """Open a trace file (by default a new one under TRACE_DIR) and start recording.
+
+        The summary is printed and the file closed at interpreter exit.
+        """
+        if path is None:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = TRACE_DIR / f"{tool}-{stamp}.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.trace_id = uuid.uuid4().hex[:12]
+        self._file = open(path, "a")
+        atexit.register(self.finish)
+        return path
+
+    def emit(self, span: Span) -> None:
+        if not self.enabled:
+            return
+        record = span.to_record(self.trace_id)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.records.append(record)
+
+    def finish(self) -> None:
+        """Print the summary and close the trace file."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._file.close()
+            self._file = None
+        self.print_summary()
+
+    def summary(self) -> list[dict]:
+        """Totals per stage name, in the order stages first finished."""
+        rows = {}
+        for r in self.records:
+            row = rows.setdefault(
+                r["name"],
+                {"name": r["name"], "count": 0, "errors": 0, "seconds": 0.0, "max": 0.0},
+            )
+            row["count"] += 1
+            row["errors"] += r["status"] == "error"
+            row["seconds"] += r["seconds"]
+            row["max"] = max(row["max"], r["seconds"])
+            for counter, value in r["counters"].items():
+                row[counter] = row.get(counter, 0) + value
+        return list(rows.values())
+
+    def print_summary(self) -> None:
+        rows = self.summary()
+        if not rows:
+            return
+        width = max(len("stage"), *(len(r["name"]) for r in rows))
+        print("\nTrace summary")
+        print("=============")
+        header = (
+            f"{'stage':<{width}} {'count':>5} {'errors':>6} "
+            f"{'total s':>9} {'mean s':>8} {'max s':>8}"
+        )
+        header += "".join(f" {c:>13}" for c in SUMMARY_COUNTERS)
+        print(header)
+        for r in rows:
+            line = (
+                f"{r['name']:<{width}} {r['count']:>5} {r['errors']:>6} {r['seconds']:>9.2f} "
+                f"{r['seconds'] / r['count']:>8.2f} {r['max']:>8.2f}"
+            )
+            line += "".join(f" {r.get(c, 0):>13,}" for c in SUMMARY_COUNTERS)
+            print(line)
+        print(f"\nTrace written to {self.path}")
+
+
+TRACER = Tracer()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a stage as a child of the current span; errors are recorded and re-raised."""
+    s = Span(name, _current.get(), attrs)
+    token = _current.set(s)
+    started = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.duration = time.perf_counter() - started
+        _current.reset(token)
+        TRACER.emit(s)
+
+
+def traced(name: str):
+    """Decorator form of span() for a function that is one whole stage."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def add(counter: str, amount: int = 1) -> None:
+    """Add to a counter on the innermost open span, if there is one."""
+    s = _current.get()
+    if s is not None:
+        s.add(counter, amount)
+
+
+def annotate(**attrs) -> None:
+    """Set attributes on the innermost open span, if there is one."""
+    s = _current.get()
+    if s is not None:
+        s.set(**attrs)
@@ -0,0 +1,92 @@
+"""Streaming WebVTT caption parser."""
+
+import re
+from bisect import bisect_left
+from collections import deque
+from typing import Iterable, Iterator, NamedTuple
+
+TIMING_RE = re.compile(
+    r"((?:\d+:)?\d{2}:\d{2}\.\d{3})\s+-->\s+((?:\d+:)?\d{2}:\d{2}\.\d{3})"
+)
+# VTT tags like <c> </c> <00:00:01.234>
+TAG_RE = re.compile(r"<[^>]+>")
+
+# Recent caption lines remembered for de-duplication. YouTube's rolling
+# auto-captions repeat each line in the next cue or two, so a short window
+# catches those without dropping lines that are legitimately said again later.
+LOOKBACK = 8
+
+
+class Segment(NamedTuple):
+    start: float
+    end: float
+    text: str
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """Convert "HH:MM:SS.mmm", "MM:SS.mmm", "HH:MM:SS" or "MM:SS" to seconds."""
+    seconds = 0.0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def iter_segments(lines: Iterable[str], lookback: int = LOOKBACK) -> Iterator[Segment]:
+    """Yield (start, end, text) caption segments from VTT lines as they arrive.
+
+    Headers, NOTE/STYLE blocks and cue identifiers are skipped; only text
+    lines following a timing line are emitted. A line identical to one of
+    the last ``lookback`` emitted lines is treated as a rolling-caption
+    repeat and dropped. Memory use is independent of caption length.
+    """
+    recent = deque(maxlen=lookback)
+    cue = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if "-->" in line:
+            timing = TIMING_RE.search(line)
+            if timing:
+                cue = (parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2)))
+            else:
+                cue = None
+            continue
+        if not line:
+            # An empty line ends the cue (YouTube pads cues with " " lines)
+            cue = None
+            continue
+        if cue is None:
+            continue
+        text = TAG_RE.sub("", line).strip() if "<" in line else line.strip()
+        if not text or text in recent:
+            continue
+        recent.append(text)
+        yield Segment(cue[0], cue[1], text)
+
+
+def segments_text(segments: Iterable[Segment]) -> str:
+    """Join segment text into a plain transcript."""
+    return " ".join(s.text for s in segments)
+
+
+def clean_vtt(vtt_text: str) -> str:
+    """Convert VTT subtitle text to plain text, removing timestamps and duplicates."""
+    return segments_text(iter_segments(vtt_text.splitlines()))
+
+
+
+def align_chapters(chapters: list[dict], segments: list[Segment]) -> list[dict]:
+    """Attach the transcript text spoken during each chapter.
+
+    ``chapters`` are as returned by ``extract_chapters``, in order; each
+    gets ``start`` (seconds) and ``text`` keys. A chapter runs until the
+    next one starts, and the last runs to the end of the transcript. Any
+    speech before the first chapter's timestamp goes to the first chapter.
+    """
+    starts = [s.start for s in segments]
+    bounds = [parse_timestamp(ch["timestamp"]) for ch in chapters]
+    aligned = []
+    for i, ch in enumerate(chapters):
+        lo = bisect_left(starts, bounds[i]) if i else 0
+        hi = bisect_left(starts, bounds[i + 1]) if i + 1 < len(bounds) else len(starts)
+        aligned.append({**ch, "start": bounds[i], "text": segments_text(segments[lo:hi])})
+    return aligned
@@ -1,19 +1,74 @@
 """One-off script to port Builder Center articles to the blog via Tavily Extract."""
 
+import argparse
+import asyncio
+import functools
 import json
 import re
 import sys
 from datetime import datetime
 from pathlib import Path
 
-import boto3
-import requests
+# Shared helpers live alongside the new-post tool.
+sys.path.insert(0, str(Path(__file__).resolve().parent / "new-post"))
+
+import bedrock_runtime  # noqa: E402
+import http_pool  # noqa: E402
+import ratelimit  # noqa: E402
+import remote_images  # noqa: E402
+import tracing  # noqa: E402
+from disk_cache import DAY, DiskCache  # noqa: E402
+from post_index import POST_INDEX  # noqa: E402
+from related_posts import RELATED_POSTS  # noqa: E402
+from search_index import SEARCH_INDEX  # noqa: E402
+from sync_manifest import MANIFEST, fingerprint  # noqa: E402
 
 BLOG_ROOT = Path(__file__).resolve().parent.parent
 POSTS_DIR = BLOG_ROOT / "_posts"
-TAVILY_API_KEY = sys.argv[1] if len(sys.argv) > 1 else ""
 
-BEDROCK_MODEL_ID = "global.anthropic.claude-opus-4-6-v1"
+ARTICLE_CACHE = DiskCache("tavily-extract", ttl=30 * DAY)
+
+TAVILY_EXTRACT_URL = "https://api.tavily.com/extract"
+
+# Tavily accepts at most 20 URLs per extract request.
+TAVILY_BATCH_SIZE = 20
+# Requests in flight at once, per backend.
+TAVILY_CONCURRENCY = 4
+BEDROCK_CONCURRENCY = 4
+
+# Most common existing tags offered to the model when tagging a post.
+TAG_VOCABULARY_SIZE = 40
+
+# Stream Bedrock output (set by --stream): sections are reported as they
+# complete and generation stops once the TAGS array closes.
+STREAM_RESPONSES = False
+METADATA_SECTIONS = ["SEO_DESCRIPTION", "CATEGORIES", "TAGS"]
+METADATA_MAX_TOKENS = 512
+# Article characters shown to the model when generating metadata.
+BODY_PREVIEW_CHARS = 6000
+
+# Fixed instructions, sent as the system prompt; the article follows in the
+# user message.
+METADATA_INSTRUCTIONS = """You are generating metadata for blog posts being ported from the AWS Builder Center to a personal tech blog by Mike Chambers (AI/ML engineer).
+
+You will be given an article's title, its Builder Center tags and a preview of its content. Generate:
+
+1. An SEO meta description (max 160 characters). Concise and compelling.
+
+2. Categories as a JSON array. Choose from: ["AI", "Tutorials"], ["AI", "Agents"], ["AI", "Models"], ["AI", "Security"]. Most tutorials use ["AI", "Tutorials"].
+
+3. Tags as a JSON array. Choose relevant lowercase tags from the ones already used on the blog: {known_tags}. Add new short lowercase tags if needed. Do NOT include "video".
+
+Return in this exact format:
+
+SEO_DESCRIPTION:
+<description>
+
+CATEGORIES:
+<json array>
+
+TAGS:
+<json array>"""
 
 URLS = [
     "https://builder.aws.com/content/34MfVfB260mYD9XCqluhtT0bGZD/streaming-agents-on-aws",
@@ -29,186 +84,311 @@ URLS = [
 ]
 
 
-def fetch_articles(urls: list[str]) -> list[dict]:
-    """Fetch article content via Tavily Extract API."""
+@tracing.traced("tavily.extract")
+def fetch_articles(urls: list[str], api_key: str) -> list[dict]:
+    """Fetch one batch of articles via Tavily Extract API, cached by source URL."""
     results = []
-    # Tavily supports up to 20 URLs per batch
-    resp = requests.post(
-        "https://api.tavily.com/extract",
-        json={"api_key": TAVILY_API_KEY, "urls": urls},
-        timeout=120,
-    )
-    resp.raise_for_status()
+    missing = []
+    for url in urls:
+        content = ARTICLE_CACHE.get(url)
+        if content is not None:
+            results.append({"url": url, "content": content})
+        else:
+            missing.append(url)
+    tracing.annotate(urls=len(urls), fetched=len(missing))
+    tracing.add("cache_hits", len(results))
+    if not missing:
+        return results
+
+    def extract():
+        resp = http_pool.get_session().post(
+            TAVILY_EXTRACT_URL,
+            json={"api_key": api_key, "urls": missing},
+            timeout=120,
+        )
+        resp.raise_for_status()
+        return resp
+
+    resp = ratelimit.call(ratelimit.TAVILY, extract, http_pool.classify_error)
+    tracing.add("bytes", len(resp.content))
     data = resp.json()
     for r in data.get("results", []):
+        ARTICLE_CACHE.set(r["url"], r["raw_content"])
         results.append({"url": r["url"], "content": r["raw_content"]})
     for f in data.get("failed_results", []):
         print(f"  FAILED: {f.get('url', 'unknown')} - {f.get('error', 'unknown error')}")
     return results
 
 
-def extract_article(raw: str) -> dict:
-    """Extract title, date, and article body from raw Tavily content."""
-    # Find the title (heading with ====)
-    title_match = re.search(r"^(.+)\n={3,}", raw, re.MULTILINE)
-    title = title_match.group(1).strip() if title_match else ""
-    # Strip " | AWS Builder Center" suffix
-    title = re.sub(r"\s*\|\s*AWS Builder Center$", "", title)
-
-    # Find published date
-    date_match = re.search(r"Published\s+(\w+\s+\d{1,2},?\s+\d{4})", raw)
-    if date_match:
-        date_str = date_match.group(1).replace(",", "")
-        try:
-            pub_date = datetime.strptime(date_str, "%b %d %Y")
-        except ValueError:
-            pub_date = datetime.strptime(date_str, "%B %d %Y")
-    else:
-        pub_date = None
-
-    # Extract article body: from after the date/separator to before comments/footer
-    # Find the start: after "Published..." and the separator "---" or "* * *"
-    start_markers = [
-        r"Published\s+\w+\s+\d{1,2},?\s+\d{4}\s*\n+\*\s*\*\s*\*\s*\n+\d+\s+\d+\s*\n+\*\s*\*\s*\*",
-        r"Published\s+\w+\s+\d{1,2},?\s+\d{4}\s*\n+\*\s*\*\s*\*",
-    ]
-    body_start = None
-    for pattern in start_markers:
-        m = re.search(pattern, raw)
-        if m:
-            body_start = m.end()
-            break
-    if body_start is None:
-        # Fallback: start after the title block
-        if title_match:
-            body_start = title_match.end() + 1
-
-    # Find the end: before tag links, "Any opinions", or "Comments"
-    end_markers = [
-        r"\n\[#\s+\w",  # Tag links like [# game-challenge]
-        r"\nAny opinions in this",
-        r"\nComments\s*\(\d+\)",
-        r"\n\*\s*\*\s*\*\s*\n+\d+\s+\d+\s*\n+\*\s*\*\s*\*\s*\nComments",
-        r"\n\*\s*\*\s*\*\s*\n+\d+\s+\d+\s*$",
-    ]
-    body_end = len(raw)
-    for pattern in end_markers:
-        m = re.search(pattern, raw)
-        if m and m.start() < body_end:
-            body_end = m.start()
-
-    body = raw[body_start:body_end].strip() if body_start else ""
-
-    # Extract builder center tags
-    bc_tags = re.findall(r"\[#\s*(\S+)\]", raw)
+# Lines of site chrome to drop from article bodies, matched against the
+# start of each stripped line.
+NAV_SKIP_RULES = (
+    r"Sign in to comment",
+    r"Sign in$",
+    r"Newest$",
+    r"Sort by$",
+    r"No more comments",
+    r"\[About\]",
+    r"\[Builder Center\]",
+    r"Cookie preferences$",
+    r"Your Privacy Choices$",
+    r"\*   \[Home\]",
+    r"\*   \[Learn\]",
+    r"\*   \[Build\]",
+    r"\*   \[Connect\]",
+    r"\*   \[Community\]",
+    r"\*   \[Wishlist\]",
+    r"Explore AWS",
+    r"Follow$",
+    r"AWS Employee$",
+)
+
+TITLE_UNDERLINE_RE = re.compile(r"={3,}")
+TITLE_SUFFIX_RE = re.compile(r"\s*\|\s*AWS Builder Center$")
+PUBLISHED_RE = re.compile(r"Published\s+(\w+\s+\d{1,2},?\s+\d{4})")
+SEPARATOR_RE = re.compile(r"\*\s*\*\s*\*$")
+COUNTS_RE = re.compile(r"\d+\s+\d+$")
+# Tag links like [# game-challenge], the disclaimer, or the comments header
+BODY_END_RE = re.compile(r"\[#\s+\w|Any opinions in this|Comments\s*\(\d+\)")
+# extract_article states in which a "Published <date>" line is looked for
+PUBLISHED_STATES = ("head", "body", "body-separator", "body-counts", "body-counts-separator")
+BC_TAG_RE = re.compile(r"\[#\s*(\S+)\]")
+IMAGE_RE = re.compile(r"!\[.*?\]\((.*?)\)")
+IMAGE_PREFIX_RE = re.compile(r"!\[Image \d+: ")
+
+
+@functools.lru_cache(maxsize=8)
+def compile_skip_rules(rules: tuple[str, ...]) -> re.Pattern:
+    """Combine skip rules into one pattern so each line is matched once."""
+    return re.compile("|".join(f"(?:{rule})" for rule in rules))
+
+
+class BodyCleaner:
+    """Accumulates article body lines, cleaning them as they arrive.
+
+    Navigation lines are dropped, runs of blank lines collapse to one,
+    "Image N: " alt-text prefixes are removed, and repeated image references
+    (Tavily often appends the article's images again at the end) are skipped.
+    """
+
+    def __init__(self, skip_rules: tuple[str, ...] = NAV_SKIP_RULES):
+        self.skip_re = compile_skip_rules(tuple(skip_rules))
+        self.reset()
+
+    def reset(self) -> None:
+        self.lines = []
+        self.images = []
+        self._seen_images = set()
+
+    def add(self, line: str) -> None:
+        stripped = line.strip()
+        if not stripped:
+            if self.lines and self.lines[-1]:
+                self.lines.append("")
+            return
+        if self.skip_re.match(stripped):
+            return
+        if stripped.startswith("!["):
+            if "![Image " in line:
+                line = IMAGE_PREFIX_RE.sub("![", line)
+                stripped = line.strip()
+            img_match = IMAGE_RE.match(stripped)
+            if img_match:
+                url = img_match.group(1)
+                if url in self._seen_images:
+                    return
+                self._seen_images.add(url)
+                self.images.append(url)
+        elif "![Image " in line:
+            line = IMAGE_PREFIX_RE.sub("![", line)
+        self.lines.append(line)
+
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+def parse_date(date_str: str) -> datetime:
+    """Parse a Builder Center date like "Dec 9, 2025" or "December 9 2025"."""
+    date_str = date_str.replace(",", "")
+    try:
+        return datetime.strptime(date_str, "%b %d %Y")
+    except ValueError:
+        return datetime.strptime(date_str, "%B %d %Y")
+
+
+def extract_article(raw: str, skip_rules: tuple[str, ...] = NAV_SKIP_RULES) -> dict:
+    """Extract title, date, cleaned body, tags and images from raw Tavily content.
+
+    Works in a single pass over the lines of ``raw``. The body starts after
+    the "Published <date>" line and its separator (plus the engagement
+    counts block, when present), falling back to just after the title when
+    there is no such marker. It ends at the tag links, the disclaimer or the
+    comments header. A "* * *" and counts block ends it only when nothing
+    but the comments (or the end of the page) follows; anywhere else, such
+    as the page head or a rule inside the article, it is kept.
+    """
+    title = ""
+    pub_date = None
+    bc_tags = []
+    body = BodyCleaner(skip_rules)
+
+    state = "head"
+    prev = ""
+    pending = []  # lines held back while a marker is only partly matched
+    saw_counts = False
+    body_confirmed = False
+
+    for line in raw.splitlines():
+        if "[#" in line:
+            bc_tags.extend(BC_TAG_RE.findall(line))
+        if state == "tail":
+            continue
+        stripped = line.strip()
+
+        if not title and prev.strip() and TITLE_UNDERLINE_RE.match(line):
+            title = TITLE_SUFFIX_RE.sub("", prev.strip())
+            if not body_confirmed:
+                # Fall back to a body that starts after the title block
+                body.reset()
+                pending = []
+                state = "body"
+            prev = line
+            continue
+        prev = line
+
+        if state in PUBLISHED_STATES and not body_confirmed:
+            published = PUBLISHED_RE.search(line)
+            if published:
+                if pub_date is None:
+                    pub_date = parse_date(published.group(1))
+                if not line[published.end():].strip():
+                    # Any separator or counts held just above it were page head
+                    pending = [line]
+                    state = "head-published" if state == "head" else "body-published"
+                    continue
+
+        if state in ("head-published", "body-published"):
+            # Blank lines and then "* * *" confirm the start of the body
+            if not stripped:
+                pending.append(line)
+                continue
+            if SEPARATOR_RE.match(stripped):
+                body.reset()
+                body_confirmed = True
+                pending = []
+                saw_counts = False
+                state = "start-counts"
+                continue
+            if state == "body-published":
+                for held in pending:
+                    body.add(held)
+            pending = []
+            state = "head" if state == "head-published" else "body"
+
+        if state == "start-counts":
+            # Optionally "N N" engagement counts and a second "* * *"
+            if not stripped:
+                pending.append(line)
+                continue
+            if COUNTS_RE.match(stripped) and not saw_counts:
+                pending.append(line)
+                saw_counts = True
+                continue
+            if SEPARATOR_RE.match(stripped) and saw_counts:
+                pending = []
+                state = "body"
+                continue
+            for held in pending:
+                body.add(held)
+            pending = []
+            state = "body"
+
+        if state in ("body-separator", "body-counts", "body-counts-separator"):
+            # "* * *" and "N N" (and maybe another "* * *") followed by the
+            # tags, disclaimer or comments, or by the end of the page, mark the
+            # end of the article; followed by anything else, they are body
+            if not stripped:
+                pending.append(line)
+                continue
+            if state == "body-separator" and COUNTS_RE.match(stripped):
+                pending.append(line)
+                state = "body-counts"
+                continue
+            if state == "body-counts" and SEPARATOR_RE.match(stripped):
+                pending.append(line)
+                state = "body-counts-separator"
+                continue
+            if state != "body-separator" and (BODY_END_RE.match(line) or stripped.startswith("Comments")):
+                state = "tail"
+                continue
+            for held in pending:
+                body.add(held)
+            pending = []
+            state = "body"
+
+        if state == "body":
+            if BODY_END_RE.match(line):
+                state = "tail"
+            elif SEPARATOR_RE.match(stripped):
+                pending = [line]
+                state = "body-separator"
+            else:
+                body.add(line)
+
+    # Counts with nothing after them are the end of the page, not the article
+    if state in ("body-separator", "body-counts-separator", "body-published"):
+        for held in pending:
+            body.add(held)
 
     return {
         "title": title,
         "date": pub_date,
-        "body": body,
+        "body": body.text() if body_confirmed or title else "",
         "bc_tags": bc_tags,
+        "images": body.images,
     }
 
 
-def clean_body(body: str) -> str:
-    """Clean up the article body markdown."""
-    # Remove duplicate image references that appear at the end
-    # (Tavily sometimes duplicates images)
-    lines = body.split("\n")
-
-    # Remove any remaining navigation fragments
-    cleaned = []
-    skip_patterns = [
-        r"^Sign in to comment",
-        r"^Sign in$",
-        r"^Newest$",
-        r"^Sort by$",
-        r"^No more comments",
-        r"^\[About\]",
-        r"^\[Builder Center\]",
-        r"^Cookie preferences$",
-        r"^Your Privacy Choices$",
-        r"^\*   \[Home\]",
-        r"^\*   \[Learn\]",
-        r"^\*   \[Build\]",
-        r"^\*   \[Connect\]",
-        r"^\*   \[Community\]",
-        r"^\*   \[Wishlist\]",
-        r"^Explore AWS",
-        r"^Follow$",
-        r"^AWS Employee$",
-    ]
-    for line in lines:
-        if any(re.match(p, line.strip()) for p in skip_patterns):
-            continue
-        cleaned.append(line)
-
-    result = "\n".join(cleaned).strip()
-
-    # Collapse 3+ consecutive blank lines to 2
-    result = re.sub(r"\n{3,}", "\n\n", result)
-
-    # Clean image alt text: remove "Image N: " prefix
-    result = re.sub(r"!\[Image \d+: ", "![", result)
-
-    # Remove duplicate images that Tavily appends at the end
-    # (identical image references appearing after the article body)
-    seen_images = set()
-    final_lines = []
-    for line in result.split("\n"):
-        img_match = re.match(r"!\[.*?\]\((.*?)\)", line.strip())
-        if img_match:
-            url = img_match.group(1)
-            if url in seen_images:
-                continue  # Skip duplicate
-            seen_images.add(url)
-        final_lines.append(line)
-    result = "\n".join(final_lines)
-
-    return result
+def clean_body(body: str, skip_rules: tuple[str, ...] = NAV_SKIP_RULES) -> str:
+    """Clean up article body markdown (see BodyCleaner)."""
+    cleaner = BodyCleaner(skip_rules)
+    for line in body.splitlines():
+        cleaner.add(line)
+    return cleaner.text()
 
 
+@tracing.traced("bedrock")
 def generate_metadata(title: str, body: str, bc_tags: list[str]) -> dict:
     """Use Bedrock to generate SEO description, categories, and tags."""
-    # Truncate body for the prompt
-    body_preview = body[:6000]
+    response = bedrock_runtime.converse_task(
+        "metadata",
+        metadata_prompt(title, body, bc_tags),
+        {"maxTokens": METADATA_MAX_TOKENS},
+        metadata_instructions(),
+        sections=METADATA_SECTIONS if STREAM_RESPONSES else None,
+        on_section=lambda name, text: print(f"  [{title[:40]}] {name}: {text[:60]}"),
+    )
+    return parse_metadata(response["text"], title)
 
-    prompt = f"""You are generating metadata for a blog post being ported from the AWS Builder Center to a personal tech blog by Mike Chambers (AI/ML engineer).
 
-**Article Title:** {title}
+def metadata_prompt(title: str, body: str, bc_tags: list[str]) -> str:
+    """The user message about an article, with its body truncated to a preview."""
+    return f"""**Article Title:** {title}
 
 **Builder Center Tags:** {', '.join(bc_tags) if bc_tags else 'none'}
 
 **Article Content (preview):**
-{body_preview}
-
-Generate:
-
-1. An SEO meta description (max 160 characters). Concise and compelling.
-
-2. Categories as a JSON array. Choose from: ["AI", "Tutorials"], ["AI", "Agents"], ["AI", "Models"], ["AI", "Security"]. Most tutorials use ["AI", "Tutorials"].
+{body[:BODY_PREVIEW_CHARS]}"""
 
-3. Tags as a JSON array. Choose relevant lowercase tags from: amazon-bedrock, agents, tools, streaming, inference, code-interpreter, memory, dynamodb, claude, mistral, rag, fine-tuning, sagemaker, lambda, tampermonkey. Add new short lowercase tags if needed. Do NOT include "video".
 
-Return in this exact format:
+def metadata_instructions() -> str:
+    """METADATA_INSTRUCTIONS with the blog's most used tags filled in."""
+    known_tags = ", ".join(POST_INDEX.tag_vocabulary(TAG_VOCABULARY_SIZE))
+    return METADATA_INSTRUCTIONS.format(known_tags=known_tags)
 
-SEO_DESCRIPTION:
-<description>
-
-CATEGORIES:
-<json array>
-
-TAGS:
-<json array>"""
-
-    client = boto3.client("bedrock-runtime")
-    response = client.converse(
-        modelId=BEDROCK_MODEL_ID,
-        messages=[{"role": "user", "content": [{"text": prompt}]}],
-        inferenceConfig={"maxTokens": 512},
-    )
-    text = response["output"]["message"]["content"][0]["text"]
 
+def parse_metadata(text: str, title: str) -> dict:
+    """Parse the SEO_DESCRIPTION / CATEGORIES / TAGS sections of a completion."""
     result = {}
     seo_match = re.search(r"SEO_DESCRIPTION:\s*\n(.*?)(?=\nCATEGORIES:)", text, re.DOTALL)
     result["description"] = seo_match.group(1).strip() if seo_match else title
@@ -234,15 +414,19 @@ def slugify(title: str, max_length: int = 60) -> str:
     return slug
 
 
+@tracing.traced("write")
 def write_post(article: dict, metadata: dict, source_url: str) -> Path:
-    """Write the blog post markdown file."""
+    """Write the blog post markdown file, with its images downloaded alongside."""
     date_str = article["date"].strftime("%Y-%m-%d") if article["date"] else "2024-01-01"
+    slug = slugify(article["title"])
     safe_title = article["title"].replace('"', '\\"')
     safe_desc = metadata["description"].replace('"', '\\"')
     cats = ", ".join(metadata["categories"])
     tags = ", ".join(metadata["tags"])
 
-    body = clean_body(article["body"])
+    body, images = remote_images.localize(article["body"], slug)
+    if images["failed"]:
+        print(f"  [{article['title'][:40]}] {images['failed']} images left remote")
 
     frontmatter = f'''---
 title: "{safe_title}"
@@ -257,47 +441,225 @@ description: "{safe_desc}"
 {body}
 '''
 
-    slug = slugify(article["title"])
     filename = f"{date_str}-{slug}.md"
     post_path = POSTS_DIR / filename
     post_path.write_text(frontmatter)
+    tracing.add("bytes", len(frontmatter.encode()))
+    POST_INDEX.add(post_path)
+    SEARCH_INDEX.update([post_path])
     return post_path
 
 
-def main():
-    if not TAVILY_API_KEY:
-        print("Usage: python port_builder_articles.py <tavily-api-key>")
-        sys.exit(1)
+def read_urls(path: str) -> list[str]:
+    """Read Builder Center URLs from a file, ignoring blanks, comments and other sites."""
+    urls = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if line.startswith("https://builder.aws.com/"):
+            urls.append(line)
+    return urls
+
 
-    print(f"Fetching {len(URLS)} articles from Builder Center via Tavily...")
-    articles = fetch_articles(URLS)
-    print(f"Successfully fetched {len(articles)} articles.\n")
+@tracing.traced("article")
+def article_fingerprint(article: dict) -> str:
+    """Fingerprint what a post is written from, ignoring likes and comments."""
+    date_str = article["date"].isoformat() if article["date"] else None
+    return fingerprint(article["title"], date_str, article["body"], article["bc_tags"])
 
-    for article_data in articles:
-        url = article_data["url"]
-        raw = article_data["content"]
 
-        print(f"Processing: {url}")
+def port_article(url: str, raw: str, check_changes: bool = False, force: bool = False) -> dict:
+    """Extract, generate metadata for, and write a single article.
 
-        # Extract article content
+    With ``check_changes``, articles whose extract is unchanged since their
+    post was written, or whose post was edited by hand, are left alone.
+    Unless ``force`` is set, an article whose title matches (or nearly
+    matches) an existing post from another source is skipped.
+    """
+    tracing.annotate(url=url)
+    with tracing.span("parse"):
         article = extract_article(raw)
-        if not article["title"]:
-            print(f"  WARNING: Could not extract title, skipping.")
-            continue
+    if not article["title"]:
+        return {"url": url, "status": "skipped", "error": "could not extract title"}
+    source_fingerprint = article_fingerprint(article)
+    if check_changes:
+        status = MANIFEST.status(url, source_fingerprint)
+        if status in ("unchanged", "adopted", "edited"):
+            return {"url": url, "status": "skipped", "error": f"{status} since last sync"}
+    duplicate = POST_INDEX.find_duplicate(article["title"], source=url)
+    if duplicate and duplicate["source"] != url and not force:
+        return {"url": url, "status": "skipped", "error": f"duplicate of {duplicate['path']}"}
+    metadata = generate_metadata(article["title"], article["body"], article["bc_tags"])
+    post_path = write_post(article, metadata, url)
+    previous = MANIFEST.record(url, post_path, source_fingerprint)
+    if previous:
+        # The title or date changed; don't leave the old post published too.
+        previous.unlink()
+        POST_INDEX.remove(previous)
+        SEARCH_INDEX.update([previous])
+        print(f"  Removed previous post: {previous.relative_to(BLOG_ROOT)}")
+    return {
+        "url": url,
+        "status": "ok",
+        "title": article["title"],
+        "post_path": post_path,
+        "replaced": previous,
+        "metadata": metadata,
+    }
+
+
+async def port_articles(
+    urls: list[str], api_key: str, check_changes: bool = False, force: bool = False
+) -> list[dict]:
+    """Fetch and port articles as a pipeline.
+
+    URLs go to Tavily in batches of TAVILY_BATCH_SIZE, fetched concurrently.
+    Each article starts metadata generation as soon as its batch arrives,
+    so Bedrock work overlaps the remaining fetches. Each backend has its own
+    concurrency cap, and a failed batch or article doesn't stop the others.
+    """
+    tavily_slots = asyncio.Semaphore(TAVILY_CONCURRENCY)
+    bedrock_slots = asyncio.Semaphore(BEDROCK_CONCURRENCY)
+    article_tasks = []
+    failures = []
+
+    async def process(url: str, raw: str) -> dict:
+        async with bedrock_slots:
+            try:
+                result = await asyncio.to_thread(
+                    port_article, url, raw, check_changes, force
+                )
+            except Exception as e:
+                result = {"url": url, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+        if result["status"] == "ok":
+            metadata = result["metadata"]
+            print(f"Written: {result['post_path'].relative_to(BLOG_ROOT)}")
+            print(f"  Categories: {metadata['categories']}, Tags: {metadata['tags']}")
+        else:
+            print(f"{result['status'].upper()}: {url} - {result['error']}")
+        return result
+
+    async def fetch(batch: list[str]) -> None:
+        async with tavily_slots:
+            try:
+                articles = await asyncio.to_thread(fetch_articles, batch, api_key)
+            except Exception as e:
+                print(f"FAILED batch of {len(batch)}: {type(e).__name__}: {e}")
+                failures.extend(
+                    {"url": url, "status": "failed", "error": f"Tavily: {e}"} for url in batch
+                )
+                return
+        print(f"Fetched {len(articles)}/{len(batch)} articles.")
+        for a in articles:
+            article_tasks.append(asyncio.create_task(process(a["url"], a["content"])))
+
+    batches = [
+        urls[i : i + TAVILY_BATCH_SIZE] for i in range(0, len(urls), TAVILY_BATCH_SIZE)
+    ]
+    await asyncio.gather(*(fetch(b) for b in batches))
+    results = await asyncio.gather(*article_tasks)
+    # Once for the whole batch: each update recomputes the similarity matrix.
+    changed = [p for r in results if r["status"] == "ok" for p in (r["post_path"], r["replaced"]) if p]
+    if changed:
+        await asyncio.to_thread(RELATED_POSTS.update, changed)
+    return failures + list(results)
+
 
-        print(f"  Title: {article['title']}")
-        print(f"  Date: {article['date']}")
+def main():
+    global STREAM_RESPONSES
+    parser = argparse.ArgumentParser(
+        description="Port Builder Center articles to the blog via Tavily Extract.",
+    )
+    parser.add_argument("api_key", nargs="?", help="Tavily API key")
+    parser.add_argument(
+        "--urls",
+        metavar="FILE",
+        help="file of article URLs, one per line (default: the built-in URLS list)",
+    )
+    parser.add_argument(
+        "--sync",
+        metavar="FILE",
+        help="like --urls, but also re-port articles whose source has changed",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-port articles even if the manifest says they are published",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="ignore cached Tavily extracts and fetch them again",
+    )
+    parser.add_argument(
+        "--regenerate",
+        action="store_true",
+        help="ignore memoized Bedrock responses and call the model again",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream Bedrock output, showing each section as it completes",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="only use memoized Bedrock responses; never call the service",
+    )
+    parser.add_argument(
+        "--model",
+        action="append",
+        default=[],
+        metavar="TASK=MODEL[,MODEL...]",
+        help="Bedrock models to try, in order, for a task "
+        f"({', '.join(bedrock_runtime.MODEL_ROUTES)}); repeatable",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="record per-stage spans as JSON lines (default file: under the tools cache) "
+        "and print a summary at the end",
+    )
+    args = parser.parse_args()
 
-        # Generate metadata via Bedrock
-        print(f"  Generating metadata via Bedrock...")
-        metadata = generate_metadata(article["title"], article["body"], article["bc_tags"])
+    if not args.api_key:
+        print("Usage: python port_builder_articles.py <tavily-api-key> [--refresh]")
+        sys.exit(1)
 
-        # Write the post
-        post_path = write_post(article, metadata, url)
-        print(f"  Written: {post_path.relative_to(BLOG_ROOT)}")
-        print(f"  Categories: {metadata['categories']}, Tags: {metadata['tags']}")
-        print()
+    ARTICLE_CACHE.refresh = args.refresh
+    bedrock_runtime.RESPONSE_CACHE.refresh = args.regenerate
+    bedrock_runtime.REPLAY_ONLY = bedrock_runtime.REPLAY_ONLY or args.replay
+    STREAM_RESPONSES = args.stream
+    for spec in args.model:
+        try:
+            bedrock_runtime.set_route(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.trace is not None:
+        tracing.TRACER.start(Path(args.trace) if args.trace else None, tool="port-builder")
+
+    if args.sync:
+        urls = read_urls(args.sync)
+    elif args.urls:
+        urls = read_urls(args.urls)
+    else:
+        urls = URLS
 
+    results = []
+    if not args.force and not args.sync:
+        published = [url for url in urls if MANIFEST.is_published(url)]
+        results = [
+            {"url": url, "status": "skipped", "error": "already published"} for url in published
+        ]
+        urls = [url for url in urls if url not in published]
+
+    print(f"Porting {len(urls)} articles from Builder Center via Tavily...\n")
+    check_changes = bool(args.sync) and not args.force
+    results += asyncio.run(port_articles(urls, args.api_key, check_changes, args.force))
+
+    counts = {s: sum(1 for r in results if r["status"] == s) for s in ("ok", "failed", "skipped")}
+    print(f"\n{counts['ok']} written, {counts['failed']} failed, {counts['skipped']} skipped.")
     print("Done!")
 
 
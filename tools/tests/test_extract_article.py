@@ -0,0 +1,60 @@
+"""extract_article on the recorded Tavily extract and reorderings of its page head."""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+from port_builder_articles import article_fingerprint, extract_article  # noqa: E402
+
+FIXTURE = TOOLS_DIR / "new-post" / "benchmarks" / "fixtures" / "tavily_extract.md"
+HEAD = "Published Dec 9, 2025\n\n* * *\n\n42 7\n\n* * *\n"
+
+
+def test_published_line_before_counts():
+    article = extract_article(FIXTURE.read_text())
+    assert article["date"] == datetime(2025, 12, 9)
+    assert article["body"].startswith("**This is Part 2 of a two-part series.**")
+
+
+def test_counts_block_before_published_line():
+    raw = FIXTURE.read_text()
+    reordered = raw.replace(HEAD, "* * *\n\n42 7\n\n* * *\n\nPublished Dec 9, 2025\n\n* * *\n", 1)
+    assert reordered != raw
+    article = extract_article(reordered)
+    assert article["date"] == datetime(2025, 12, 9)
+    assert article["body"] == extract_article(raw)["body"]
+
+
+def test_inline_published_line():
+    raw = FIXTURE.read_text().replace("Published Dec 9, 2025\n", "Published Dec 9, 2025 · 5 min read\n", 1)
+    article = extract_article(raw)
+    assert article["date"] == datetime(2025, 12, 9)
+    # No standalone marker, so the body starts after the title and runs to the tags
+    assert "**This is Part 2 of a two-part series.**" in article["body"]
+    assert article["body"].endswith(extract_article(FIXTURE.read_text())["body"][-200:])
+
+
+def test_missing_published_line():
+    raw = FIXTURE.read_text().replace("Published Dec 9, 2025\n\n", "", 1)
+    article = extract_article(raw)
+    assert article["date"] is None
+    assert "**This is Part 2 of a two-part series.**" in article["body"]
+    assert article["body"].endswith(extract_article(FIXTURE.read_text())["body"][-200:])
+
+
+def test_rule_and_numbers_inside_body():
+    raw = FIXTURE.read_text()
+    ruled = raw.replace("**Configuration details**:", "* * *\n\n3 4\n\n**Configuration details**:", 1)
+    body = extract_article(ruled)["body"]
+    assert "3 4\n\n**Configuration details**:" in body
+    assert body.endswith(extract_article(raw)["body"][-200:])
+
+
+def test_fingerprint_ignores_engagement_counts():
+    raw = FIXTURE.read_text()
+    recounted = raw.replace(HEAD, HEAD.replace("42 7", "43 9"), 1)
+    assert recounted != raw
+    assert article_fingerprint(extract_article(recounted)) == article_fingerprint(extract_article(raw))
@@ -0,0 +1,71 @@
+"""Duplicate detection in PostIndex.find_duplicate."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+from post_index import PostIndex  # noqa: E402
+
+TITLES = {
+    "2025-01-01-claude-sonnet.md": "Claude 3.5 Sonnet: Computer Use on Amazon Bedrock",
+    "2025-01-02-the-how-to.md": "The How-To",
+    "2025-01-03-agents.md": "Deploy AI Agents to Production with AgentCore Runtime",
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    posts_dir = tmp_path / "_posts"
+    posts_dir.mkdir()
+    for name, title in TITLES.items():
+        (posts_dir / name).write_text(f'---\ntitle: "{title}"\n---\n\nBody.\n')
+    (posts_dir / "2025-01-04-video.md").write_text(
+        "---\ntitle: A Video\n---\n\n{% include embed/youtube.html id='abc123' %}\n"
+    )
+    return PostIndex(posts_dir=posts_dir, index_path=tmp_path / "post-index.json")
+
+
+def found(index: PostIndex, title: str, source: str | None = None) -> str | None:
+    post = index.find_duplicate(title, source)
+    return post and Path(post["path"]).name
+
+
+def test_same_source(index):
+    assert found(index, "Something else entirely", "youtube:abc123") == "2025-01-04-video.md"
+
+
+def test_same_title_ignoring_case_and_punctuation(index):
+    assert found(index, "claude 3.5 sonnet - computer use on amazon bedrock") == "2025-01-01-claude-sonnet.md"
+
+
+def test_reworded_title_with_most_words_in_common(index):
+    # 6 of 7 significant words shared
+    title = "Deploy AI Agents to Production with the AgentCore Runtime SDK"
+    assert found(index, title) == "2025-01-03-agents.md"
+    assert found(index, "Amazon Bedrock: Claude 3.5 Sonnet Computer Use") == "2025-01-01-claude-sonnet.md"
+
+
+def test_titles_sharing_a_few_words_are_not_duplicates(index):
+    assert found(index, "Deploy AI Agents to Production with Strands") is None
+    assert found(index, "Claude 3.7 Sonnet on Amazon Bedrock") is None
+
+
+def test_stopword_only_titles_never_near_match(index):
+    # Both titles are made only of stopwords, so neither has a near key
+    assert found(index, "How To: What Is It?") is None
+    assert found(index, "The How-To") == "2025-01-02-the-how-to.md"
+
+
+def test_added_and_removed_posts_are_reindexed(index, tmp_path):
+    path = tmp_path / "_posts" / "2025-02-01-strands.md"
+    path.write_text('---\ntitle: "Building Agents with Strands"\n---\n')
+    index.add(path)
+    assert found(index, "Building Agents With Strands!") == "2025-02-01-strands.md"
+    assert found(index, "Strands: Building Agents") == "2025-02-01-strands.md"
+    path.unlink()
+    index.remove(path)
+    assert found(index, "Strands: Building Agents") is None
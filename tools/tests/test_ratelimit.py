@@ -0,0 +1,115 @@
+"""AIMD rate adjustment, Retry-After parsing and the retry loop in ratelimit."""
+
+import sys
+import time
+from email.utils import formatdate
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+import ratelimit  # noqa: E402
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record sleeps instead of taking them."""
+    slept = []
+    monkeypatch.setattr(ratelimit.time, "sleep", slept.append)
+    monkeypatch.setattr(ratelimit, "backoff", lambda attempt: 0.0)
+    return slept
+
+
+def test_throttle_cuts_rate_multiplicatively_down_to_min():
+    limiter = ratelimit.AdaptiveRateLimiter("test", rate=10.0, min_rate=4.0)
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(7.0)
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(4.9)
+    limiter.on_throttle()
+    assert limiter.rate == 4.0
+
+
+def test_success_raises_rate_additively_up_to_max():
+    limiter = ratelimit.AdaptiveRateLimiter("test", rate=1.0, max_rate=1.1, increase=0.05)
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(1.05)
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == 1.1
+
+
+def test_retry_after_holds_acquire(sleeps):
+    limiter = ratelimit.AdaptiveRateLimiter("test", rate=100.0, burst=5.0)
+    limiter.on_throttle(retry_after=30.0)
+    limiter.acquire()
+    assert sleeps and sleeps[0] == pytest.approx(30.0, abs=0.5)
+
+
+def test_acquire_spaces_requests_past_the_burst(sleeps):
+    limiter = ratelimit.AdaptiveRateLimiter("test", rate=2.0, burst=1.0)
+    limiter.acquire()
+    limiter.acquire()
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(0.5, abs=0.05)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("5", 5.0), ("0.25", 0.25), ("-3", 0.0), ("", None), (None, None), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value, expected):
+    assert ratelimit.parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    value = formatdate(time.time() + 120, usegmt=True)
+    assert ratelimit.parse_retry_after(value) == pytest.approx(120, abs=2)
+    assert ratelimit.parse_retry_after(formatdate(time.time() - 120, usegmt=True)) == 0.0
+
+
+def test_call_retries_throttles_then_succeeds(sleeps):
+    limiter = ratelimit.AdaptiveRateLimiter("test", rate=10.0, burst=10.0)
+    outcomes = [RuntimeError("throttled"), RuntimeError("throttled"), "ok"]
+
+    def func():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    result = ratelimit.call(limiter, func, lambda e: ("throttle", 2.0))
+    assert result == "ok"
+    assert limiter.rate == pytest.approx(10.0 * 0.7 * 0.7 + 0.05)
+    assert sleeps.count(2.0) == 2
+
+
+def test_call_does_not_retry_fatal_errors(sleeps):
+    limiter = ratelimit.AdaptiveRateLimiter("test", rate=10.0, burst=10.0)
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        ratelimit.call(limiter, func, lambda e: (None, None))
+    assert len(calls) == 1
+    assert limiter.rate == 10.0
+
+
+def test_call_gives_up_after_max_attempts(sleeps):
+    limiter = ratelimit.AdaptiveRateLimiter("test", rate=10.0, burst=10.0)
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        ratelimit.call(limiter, func, lambda e: ("retry", None), max_attempts=3)
+    assert len(calls) == 3
+    # Transient failures are retried without slowing down
+    assert limiter.rate == 10.0
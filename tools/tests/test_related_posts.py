@@ -0,0 +1,110 @@
+"""Incremental RelatedPosts.update against a full rebuild of the same posts.
+
+Each topic has more posts than TOP_K, so every neighbour list is made of
+clear matches. Among near-ties (unrelated posts scoring ~0.1) the lists
+kept by an incremental update can legitimately differ, as untouched rows
+keep the IDF weights they were scored with.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+pytest.importorskip("scipy")
+
+from related_posts import RelatedPosts  # noqa: E402
+
+TOPICS = {
+    "bedrock": "bedrock agents claude prompt model inference guardrails",
+    "python": "python pandas numpy dataframe notebook plotting",
+    "containers": "kubernetes docker containers cluster helm pods",
+    "audio": "speech transcription whisper audio captions diarization",
+}
+
+
+def write_post(directory: Path, slug: str, topic: str, extra: str, day: int = 1) -> Path:
+    path = directory / f"2025-01-{day:02d}-{slug}.md"
+    path.write_text(
+        f"---\ntitle: {slug.replace('-', ' ').title()}\ntags: [{topic}]\n"
+        f"description: A post about {topic}.\n---\n\n{TOPICS[topic]} {extra}\n"
+    )
+    return path
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    posts_dir = tmp_path / "posts"
+    posts_dir.mkdir()
+    paths = []
+    for t, topic in enumerate(TOPICS):
+        for i in range(4):
+            extra = f"{topic}{i} " * (i + 1) + " ".join(f"unique{t}x{i}x{w}" for w in range(4))
+            paths.append(write_post(posts_dir, f"{topic}-part-{i}", topic, extra, day=t * 4 + i + 1))
+    return posts_dir, paths
+
+
+def related(tmp_path: Path, name: str) -> RelatedPosts:
+    return RelatedPosts(state_path=tmp_path / f"{name}-state.json", data_path=tmp_path / f"{name}.json")
+
+
+def neighbour_names(index: RelatedPosts) -> dict[str, list[str]]:
+    return {post: [other for other, _ in found] for post, found in index._state["neighbours"].items()}
+
+
+def assert_matches_rebuild(index: RelatedPosts, tmp_path: Path, posts_dir: Path) -> None:
+    full = related(tmp_path, "rebuilt")
+    full.update(sorted(posts_dir.glob("*.md")), rebuild=True)
+    # Scores of untouched rows drift with the IDF weights; the lists must not
+    assert neighbour_names(index) == neighbour_names(full)
+
+
+def test_neighbours_share_a_topic(tmp_path, corpus):
+    posts_dir, paths = corpus
+    index = related(tmp_path, "incremental")
+    assert index.update(paths) == len(paths)
+    for post, others in neighbour_names(index).items():
+        topic = Path(post).name.split("-")[3]
+        assert [Path(o).name.split("-")[3] for o in others] == [topic] * 3
+
+
+def test_adding_a_post_matches_rebuild(tmp_path, corpus):
+    posts_dir, paths = corpus
+    index = related(tmp_path, "incremental")
+    index.update(paths)
+    new = write_post(posts_dir, "audio-part-4", "audio", "audio0 audio1 whisper captions", day=20)
+    assert index.update([new]) == 1
+    assert_matches_rebuild(index, tmp_path, posts_dir)
+
+
+def test_editing_a_post_matches_rebuild(tmp_path, corpus):
+    posts_dir, paths = corpus
+    index = related(tmp_path, "incremental")
+    index.update(paths)
+    # Move one post from the python topic to the containers one
+    edited = write_post(posts_dir, "python-part-1", "containers", "containers1 helm pods cluster", day=6)
+    assert edited in paths
+    assert index.update([edited]) == 1
+    assert_matches_rebuild(index, tmp_path, posts_dir)
+
+
+def test_removing_a_post_matches_rebuild(tmp_path, corpus):
+    posts_dir, paths = corpus
+    index = related(tmp_path, "incremental")
+    index.update(paths)
+    paths[0].unlink()
+    assert index.update([paths[0]]) == 1
+    names = neighbour_names(index)
+    assert str(paths[0]) not in names
+    assert all(str(paths[0]) not in others for others in names.values())
+    assert_matches_rebuild(index, tmp_path, posts_dir)
+
+
+def test_unchanged_posts_are_not_recounted(tmp_path, corpus):
+    _, paths = corpus
+    index = related(tmp_path, "incremental")
+    index.update(paths)
+    assert index.update(paths) == 0
@@ -0,0 +1,76 @@
+"""Incremental SearchIndex updates against an index built from scratch."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+from search_index import SearchIndex, shard_key, terms  # noqa: E402
+
+
+def write_post(posts_dir: Path, slug: str, title: str, body: str) -> Path:
+    path = posts_dir / f"2025-01-01-{slug}.md"
+    path.write_text(f'---\ntitle: "{title}"\ntags: [agents]\ncategories: [AI]\n---\n\n{body}\n')
+    return path
+
+
+def published(index_dir: Path) -> dict[str, dict[str, int]]:
+    """term -> {post url: weight}, read back from the written files."""
+    docs = json.loads((index_dir / "docs.json").read_text())
+    urls = {int(doc_id): doc["url"] for doc_id, doc in docs["posts"].items()}
+    result = {}
+    for key in docs["shards"]:
+        for term, postings in json.loads((index_dir / f"{key}.json").read_text()).items():
+            assert shard_key(term) == key
+            result[term] = {urls[doc_id]: weight for doc_id, weight in postings}
+    return result
+
+
+@pytest.fixture
+def posts_dir(tmp_path):
+    directory = tmp_path / "_posts"
+    directory.mkdir()
+    write_post(directory, "bedrock", "Agents on Bedrock", "Bedrock agents call tools. " * 8)
+    write_post(directory, "strands", "Strands Agents", "Strands is an SDK for agents, 3x faster.")
+    return directory
+
+
+def index_at(tmp_path: Path, name: str) -> SearchIndex:
+    return SearchIndex(index_dir=tmp_path / name, state_path=tmp_path / f"{name}.json")
+
+
+def test_terms_skip_stopwords_and_single_characters():
+    assert terms("What is an AI agent? A 3x speed-up!") == ["ai", "agent", "3x", "speed", "up"]
+
+
+def test_title_outweighs_capped_body_repeats(tmp_path, posts_dir):
+    index = index_at(tmp_path, "search")
+    assert index.update(sorted(posts_dir.glob("*.md"))) == 2
+    postings = published(tmp_path / "search")
+    # title 10 + tags 6 + body capped at 5
+    assert postings["agents"]["/posts/bedrock/"] == 21
+    assert postings["bedrock"]["/posts/bedrock/"] == 15
+    assert "3x" in postings and shard_key("3x") == "3x"
+
+
+def test_incremental_updates_match_a_fresh_build(tmp_path, posts_dir):
+    index = index_at(tmp_path, "incremental")
+    index.update(sorted(posts_dir.glob("*.md")))
+    write_post(posts_dir, "strands", "Strands Agents", "Now with multi-agent swarms.")
+    added = write_post(posts_dir, "mcp", "MCP servers", "Model Context Protocol for agents.")
+    gone = posts_dir / "2025-01-01-bedrock.md"
+    gone.unlink()
+    assert index.update(sorted(posts_dir.glob("*.md")) + [gone]) == 3
+    assert index.update([added]) == 0
+
+    fresh = index_at(tmp_path, "fresh")
+    fresh.update(sorted(posts_dir.glob("*.md")))
+    assert published(tmp_path / "incremental") == published(tmp_path / "fresh")
+    assert "bedrock" not in published(tmp_path / "incremental")
+    # Shards left empty by the removal are deleted, not written empty
+    assert not (tmp_path / "incremental" / "be.json").exists()
+    assert index.counts() == (2, len(list((tmp_path / "incremental").glob("*.json"))) - 1)
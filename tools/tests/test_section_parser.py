@@ -0,0 +1,104 @@
+"""bedrock_runtime.SectionParser on completions split at arbitrary chunk boundaries."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+import bedrock_runtime  # noqa: E402
+import disk_cache  # noqa: E402
+
+SECTIONS = ["SEO_DESCRIPTION", "CATEGORIES", "TAGS"]
+COMPLETION = """SEO_DESCRIPTION:
+How to run agents on Bedrock, with "quotes" and brackets [like these].
+
+CATEGORIES:
+["AI", "Tutorials"]
+
+TAGS:
+["bedrock", "agents ]", "tag \\"with\\" quotes"]"""
+EXPECTED = [
+    ("SEO_DESCRIPTION", 'How to run agents on Bedrock, with "quotes" and brackets [like these].'),
+    ("CATEGORIES", '["AI", "Tutorials"]'),
+    ("TAGS", '["bedrock", "agents ]", "tag \\"with\\" quotes"]'),
+]
+
+
+def feed(chunks: list[str]) -> tuple[bedrock_runtime.SectionParser, list[tuple[str, str]]]:
+    seen = []
+    parser = bedrock_runtime.SectionParser(SECTIONS, lambda name, text: seen.append((name, text)))
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser, seen
+
+
+def test_whole_completion_in_one_chunk():
+    parser, seen = feed([COMPLETION])
+    assert parser.done
+    assert seen == EXPECTED
+    assert parser.buffer == COMPLETION
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 16])
+def test_chunk_boundaries_anywhere(size):
+    chunks = [COMPLETION[i : i + size] for i in range(0, len(COMPLETION), size)]
+    parser, seen = feed(chunks)
+    assert parser.done
+    assert seen == EXPECTED
+
+
+def test_header_split_across_chunks():
+    at = COMPLETION.index("CATEGORIES:") + len("CATEG")
+    parser, seen = feed([COMPLETION[:at], COMPLETION[at:]])
+    assert seen == EXPECTED
+
+
+def test_done_as_soon_as_the_final_array_closes():
+    parser, seen = feed([COMPLETION + "\n\nSome trailing chatter.", "\nMore."])
+    assert parser.done
+    assert parser.buffer == COMPLETION
+    assert len(seen) == 3
+
+
+def test_header_text_mid_line_is_not_a_header():
+    completion = COMPLETION.replace(
+        "brackets [like these].", "brackets [like these]. See TAGS: below."
+    )
+    _, seen = feed([completion])
+    assert seen[0] == (
+        "SEO_DESCRIPTION",
+        'How to run agents on Bedrock, with "quotes" and brackets [like these]. See TAGS: below.',
+    )
+    assert seen[1:] == EXPECTED[1:]
+
+
+def test_incomplete_final_array_is_not_done():
+    parser, seen = feed([COMPLETION[:-1]])
+    assert not parser.done
+    assert [name for name, _ in seen] == ["SEO_DESCRIPTION", "CATEGORIES"]
+
+
+class FakeStream(list):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_converse_sections_stops_the_stream_early(monkeypatch, tmp_path):
+    monkeypatch.setattr(disk_cache, "CACHE_ROOT", tmp_path)
+    monkeypatch.setattr(bedrock_runtime, "REPLAY_ONLY", False)
+    text = COMPLETION + "\n\nThis should never be read."
+    stream = FakeStream(
+        {"contentBlockDelta": {"delta": {"text": text[i : i + 4]}}} for i in range(0, len(text), 4)
+    )
+    stream.append({"metadata": {"usage": {"inputTokens": 10, "outputTokens": 20}}})
+    monkeypatch.setattr(bedrock_runtime, "call", lambda operation, **kwargs: {"stream": stream})
+
+    response = bedrock_runtime.converse_sections("model", "prompt", {"maxTokens": 10}, SECTIONS)
+    assert response["text"] == COMPLETION
+    assert not response["cached"]
+    assert stream.closed
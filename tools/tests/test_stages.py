@@ -0,0 +1,118 @@
+"""Dependency ordering and failure handling in stages.run_stages."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+import stages  # noqa: E402
+import tracing  # noqa: E402
+
+
+def test_results_flow_to_dependents():
+    results = stages.run_stages(
+        {
+            "a": (lambda: 2, ()),
+            "b": (lambda: 3, ()),
+            "product": (lambda a, b: a * b, ("a", "b")),
+            "label": (lambda product: f"={product}", ("product",)),
+        }
+    )
+    assert results == {"a": 2, "b": 3, "product": 6, "label": "=6"}
+
+
+def test_stage_starts_only_after_its_dependencies():
+    order = []
+    lock = threading.Lock()
+
+    def stage(name):
+        def run(**deps):
+            with lock:
+                order.append(name)
+            return name
+
+        return run
+
+    stages.run_stages(
+        {
+            "fetch": (stage("fetch"), ()),
+            "parse": (stage("parse"), ("fetch",)),
+            "thumbnail": (stage("thumbnail"), ()),
+            "write": (stage("write"), ("parse", "thumbnail")),
+        }
+    )
+    assert order.index("fetch") < order.index("parse") < order.index("write")
+    assert order.index("thumbnail") < order.index("write")
+
+
+def test_independent_stages_run_concurrently():
+    both_started = threading.Barrier(2, timeout=5)
+
+    def stage(name):
+        def run():
+            # Would time out (BrokenBarrierError) if the stages ran one at a time
+            both_started.wait()
+            return name
+
+        return run
+
+    results = stages.run_stages({"a": (stage("a"), ()), "b": (stage("b"), ())})
+    assert results == {"a": "a", "b": "b"}
+
+
+def test_failure_skips_dependents_and_reraises():
+    ran = []
+
+    def fail():
+        raise RuntimeError("fetch failed")
+
+    with pytest.raises(RuntimeError, match="fetch failed"):
+        stages.run_stages(
+            {
+                "fetch": (fail, ()),
+                "parse": (lambda fetch: ran.append("parse"), ("fetch",)),
+                "write": (lambda parse: ran.append("write"), ("parse",)),
+            }
+        )
+    assert ran == []
+
+
+def test_running_stages_finish_before_the_error_is_raised():
+    release = threading.Event()
+    finished = []
+
+    def slow():
+        release.wait(5)
+        finished.append("slow")
+
+    def fail():
+        release.set()
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        stages.run_stages({"slow": (slow, ()), "fail": (fail, ())})
+    assert finished == ["slow"]
+
+
+@pytest.mark.parametrize(
+    ("graph", "message"),
+    [
+        ({"a": (lambda missing: None, ("missing",))}, "unknown stage"),
+        ({"a": (lambda b: None, ("b",)), "b": (lambda a: None, ("a",))}, "cycle"),
+    ],
+)
+def test_bad_graphs_are_rejected_before_running(graph, message):
+    with pytest.raises(ValueError, match=message):
+        stages.run_stages(graph)
+
+
+def test_stages_nest_under_the_callers_span():
+    with tracing.span("post") as parent:
+        stages.run_stages(
+            {"a": (lambda: tracing.add("bytes", 5), ()), "b": (lambda: tracing.add("bytes", 7), ())}
+        )
+    assert parent.counters == {"bytes": 12}
@@ -0,0 +1,87 @@
+"""The streaming VTT parser and chapter alignment."""
+
+import sys
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(TOOLS_DIR / "new-post"), str(TOOLS_DIR)]
+
+import vtt  # noqa: E402
+from new_post import extract_chapters, transcript_text  # noqa: E402
+
+# YouTube's rolling auto-captions: each cue repeats the previous line.
+ROLLING = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+
+welcome<00:00:00.500><c> to</c><00:00:01.000><c> the</c><00:00:01.500><c> show</c>
+
+00:00:02.000 --> 00:00:02.010 align:start position:0%
+welcome to the show
+
+
+00:00:02.010 --> 00:00:04.000 align:start position:0%
+welcome to the show
+today we build an agent
+
+00:01:05.000 --> 00:01:07.000
+first the setup
+
+01:02:03.500 --> 01:02:05.000
+thanks for watching
+"""
+
+
+def test_rolling_captions_are_deduplicated():
+    segments = list(vtt.iter_segments(ROLLING.splitlines()))
+    assert [s.text for s in segments] == [
+        "welcome to the show",
+        "today we build an agent",
+        "first the setup",
+        "thanks for watching",
+    ]
+    assert segments[1] == vtt.Segment(2.01, 4.0, "today we build an agent")
+    assert segments[-1].start == 3723.5
+
+
+def test_lines_repeated_later_are_kept():
+    cues = "".join(
+        f"00:00:{i:02d}.000 --> 00:00:{i:02d}.500\n{line}\n\n" for i, line in enumerate("abcdefghija")
+    )
+    assert [s.text for s in vtt.iter_segments(cues.splitlines(), lookback=4)] == list("abcdefghija")
+    assert [s.text for s in vtt.iter_segments(cues.splitlines(), lookback=20)] == list("abcdefghij")
+
+
+def test_clean_vtt_matches_segments_text():
+    assert vtt.clean_vtt(ROLLING) == (
+        "welcome to the show today we build an agent first the setup thanks for watching"
+    )
+
+
+def test_align_chapters_by_segment_start():
+    segments = list(vtt.iter_segments(ROLLING.splitlines()))
+    chapters = extract_chapters("0:01 Intro\n1:00 Setup\n1:02:00 Outro")
+    aligned = vtt.align_chapters(chapters, segments)
+    assert [(ch["title"], ch["start"], ch["text"]) for ch in aligned] == [
+        # Speech before the first timestamp belongs to the first chapter
+        ("Intro", 1.0, "welcome to the show today we build an agent"),
+        ("Setup", 60.0, "first the setup"),
+        ("Outro", 3720.0, "thanks for watching"),
+    ]
+
+
+def test_transcript_text_uses_chapter_headings():
+    segments = list(vtt.iter_segments(ROLLING.splitlines()))
+    text = transcript_text(segments, extract_chapters("00:00 Intro\n01:00 Setup"))
+    assert text == (
+        "[00:00] Intro\nwelcome to the show today we build an agent\n\n"
+        "[01:00] Setup\nfirst the setup thanks for watching"
+    )
+
+
+def test_transcript_text_ignores_timestamps_out_of_order():
+    segments = list(vtt.iter_segments(ROLLING.splitlines()))
+    chapters = extract_chapters("Recorded 10:30 - morning session\n02:00 Later")
+    assert transcript_text(segments, chapters) == vtt.segments_text(segments)
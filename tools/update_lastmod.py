@@ -0,0 +1,116 @@
+"""Precompute each post's commit count and last-modified date from git history.
+
+Walks the history once with ``git log --name-only`` and writes
+``_data/lastmod.json``, which ``_plugins/posts-lastmod-hook.rb`` reads
+instead of running git for every post on every build:
+
+    {"commit": "<last commit processed>",
+     "posts": {"_posts/2025-01-01-example.md": {"commits": 3, "lastmod": "2025-02-01 10:00:00 +1000"}}}
+
+Later runs only walk the commits added since the recorded one. If that
+commit is no longer in the history (a rebase, or a shallow clone), the
+file is rebuilt from scratch.
+
+    python tools/update_lastmod.py [--full]
+"""
+
+import argparse
+import json
+import subprocess
+from pathlib import Path
+
+BLOG_ROOT = Path(__file__).resolve().parent.parent
+DATA_PATH = BLOG_ROOT / "_data" / "lastmod.json"
+POST_DIRS = ("_posts",)
+
+# Starts each commit's record in the log output: hash, then author date
+# in the format the hook used to ask git for.
+COMMIT_MARKER = "\x00"
+LOG_FORMAT = "%x00%H%x09%ad"
+
+
+def git(*args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=BLOG_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def is_ancestor(commit: str, of: str = "HEAD") -> bool:
+    result = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", commit, of],
+        cwd=BLOG_ROOT,
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def walk_history(since: str | None) -> dict[str, dict]:
+    """Commit counts and newest dates per post path, for commits after ``since``.
+
+    Renames are listed as a delete and an add, so each path is counted the
+    way ``git rev-list --count HEAD -- <path>`` counts it.
+    """
+    revs = f"{since}..HEAD" if since else "HEAD"
+    out = git(
+        "log", "--no-renames", "--name-only", "--date=iso", f"--format={LOG_FORMAT}",
+        revs, "--", *POST_DIRS,
+    )
+    posts = {}
+    date = None
+    for line in out.splitlines():
+        if line.startswith(COMMIT_MARKER):
+            date = line[len(COMMIT_MARKER) :].split("\t", 1)[1]
+        elif line:
+            # git log lists the newest commit first, so the first date seen wins.
+            entry = posts.setdefault(line, {"commits": 0, "lastmod": date})
+            entry["commits"] += 1
+    return posts
+
+
+def load() -> dict:
+    try:
+        return json.loads(DATA_PATH.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"commit": None, "posts": {}}
+
+
+def update(full: bool = False) -> tuple[dict, int]:
+    """Bring the data file up to date with HEAD; returns it and the posts changed."""
+    data = {"commit": None, "posts": {}} if full else load()
+    head = git("rev-parse", "HEAD").strip()
+    if data["commit"] == head:
+        return data, 0
+    if data["commit"] and not is_ancestor(data["commit"]):
+        data = {"commit": None, "posts": {}}
+
+    changed = walk_history(data["commit"])
+    for path, entry in changed.items():
+        known = data["posts"].get(path)
+        if known:
+            entry["commits"] += known["commits"]
+        data["posts"][path] = entry
+    data["commit"] = head
+
+    DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
+    DATA_PATH.write_text(json.dumps(data, indent=1, sort_keys=True) + "\n")
+    return data, len(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute post last-modified dates from git history.")
+    parser.add_argument("--full", action="store_true", help="ignore the existing file and walk all history")
+    args = parser.parse_args()
+
+    previous = None if args.full else load()["commit"]
+    data, changed = update(args.full)
+    if previous and previous == data["commit"]:
+        print(f"{DATA_PATH.relative_to(BLOG_ROOT)} is up to date with {data['commit'][:12]}.")
+        return
+    print(
+        f"Updated {changed} of {len(data['posts'])} posts in {DATA_PATH.relative_to(BLOG_ROOT)} "
+        f"(history up to {data['commit'][:12]})."
+    )
+
+
+if __name__ == "__main__":
+    main()